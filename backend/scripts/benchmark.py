@@ -0,0 +1,182 @@
+# Load / latency benchmark for the FastAPI service + micro-benchmarks for the serving hot path
+#
+# Run from backend/ (same as the API, so artifacts/ resolves):
+#   python scripts/benchmark.py                           # app in-process (httpx ASGI transport, no network)
+#   python scripts/benchmark.py --url http://127.0.0.1:8000 --concurrency 32
+#
+# Reports throughput and p50/p95/p99 latency per scenario to a JSON file (--output). Records are drawn from
+# Ridership-Data.csv with a fixed seed, so two runs send the same requests. Needs httpx (pip install httpx).
+
+import argparse, asyncio, json, platform, random, sys, time
+from pathlib import Path
+import numpy as np
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+import pandas as pd
+from ttc_rider_api.model import load_model, predict_batch, records_frame
+from ttc_rider_api.service_hours import open_mask
+from ttc_rider_api.prediction_table import DATA_PATH, DAYS, station_line_pairs
+from ttc_rider_api.booster import native_from_pipeline
+
+
+def percentiles(latencies: list[float]) -> dict:
+    ms = np.asarray(latencies) * 1000
+    return {
+        "p50_ms": float(np.percentile(ms, 50)),
+        "p95_ms": float(np.percentile(ms, 95)),
+        "p99_ms": float(np.percentile(ms, 99)),
+        "mean_ms": float(ms.mean()),
+        "max_ms": float(ms.max()),
+    }
+
+
+def make_records(pairs: tuple[list[str], list[str]], n: int, rng: random.Random) -> list[dict]:
+    stations, lines = pairs
+    out = []
+    for _ in range(n):
+        i = rng.randrange(len(stations))
+        out.append({"station": stations[i], "line": lines[i], "day": rng.choice(DAYS), "hour": rng.randrange(24)})
+    return out
+
+
+async def run_scenario(client, name: str, method: str, path: str, bodies: list, concurrency: int) -> dict:
+    """Send every body once, `concurrency` requests in flight at a time; record per-request latency."""
+    queue = list(reversed(bodies))
+    latencies: list[float] = []
+    errors = 0
+
+    async def worker():
+        nonlocal errors
+        while queue:
+            body = queue.pop()
+            t0 = time.perf_counter()
+            res = await client.request(method, path, json=body)
+            latencies.append(time.perf_counter() - t0)
+            if res.status_code >= 400:
+                errors += 1
+
+    t0 = time.perf_counter()
+    await asyncio.gather(*[worker() for _ in range(concurrency)])
+    wall = time.perf_counter() - t0
+
+    result = {
+        "scenario": name,
+        "requests": len(latencies),
+        "errors": errors,
+        "concurrency": concurrency,
+        "wall_seconds": wall,
+        "requests_per_second": len(latencies) / wall,
+        **percentiles(latencies),
+    }
+    print(f"{name:<20} {result['requests_per_second']:>9.1f} req/s  "
+          f"p50 {result['p50_ms']:.2f}ms  p95 {result['p95_ms']:.2f}ms  p99 {result['p99_ms']:.2f}ms  errors {errors}")
+    return result
+
+
+async def load_benchmarks(args, pairs) -> list[dict]:
+    import httpx
+
+    if args.url:
+        async with httpx.AsyncClient(base_url=args.url, timeout=60) as client:
+            await wait_ready(client)
+            return await run_load(client, args, pairs)
+
+    from ttc_rider_api.main import app
+    # Run the app's lifespan (load + warm-up) like a real worker, and only start measuring once it reports ready
+    async with app.router.lifespan_context(app):
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench", timeout=60) as client:
+            await wait_ready(client)
+            return await run_load(client, args, pairs)
+
+
+async def wait_ready(client, timeout: float = 120.0):
+    deadline = time.perf_counter() + timeout
+    while (await client.get("/ready")).status_code != 200:
+        if time.perf_counter() > deadline:
+            raise RuntimeError("service did not become ready")
+        await asyncio.sleep(0.1)
+
+
+async def run_load(client, args, pairs) -> list[dict]:
+    rng = random.Random(args.seed)
+    results = []
+    for size in (1, 10, 100, 1000):
+        # Fewer requests for the big batches so each scenario takes a similar amount of time
+        n = max(args.requests // max(size // 10, 1), 20)
+        bodies = [{"records": make_records(pairs, size, rng)} for _ in range(n)]
+        results.append(await run_scenario(client, f"predict_{size}", "POST", "/predict", bodies, args.concurrency))
+    results.append(await run_scenario(client, "options", "GET", "/options", [None] * args.requests, args.concurrency))
+    results.append(await run_scenario(client, "health", "GET", "/health", [None] * args.requests, args.concurrency))
+    return results
+
+
+def time_call(fn, repeat: int) -> dict:
+    fn()  # warm-up
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - t0)
+    return percentiles(times)
+
+
+def micro_benchmarks(pairs, repeat: int, seed: int) -> list[dict]:
+    pipe, meta = load_model()
+    models = {"sklearn": pipe, "native": native_from_pipeline(pipe, meta.get("model_version", "unknown"))}
+    rng = np.random.default_rng(seed)
+    stations, lines = np.asarray(pairs[0], dtype=object), np.asarray(pairs[1], dtype=object)
+
+    results = []
+    for size in (1, 100, 1000, 10000):
+        idx = rng.integers(0, len(stations), size)
+        frame = records_frame(stations[idx], lines[idx], np.asarray(DAYS, dtype=object)[rng.integers(0, 7, size)],
+                              rng.integers(6, 24, size))
+        for name, model in models.items():
+            stats = time_call(lambda: predict_batch(model, frame), repeat)
+            results.append({"benchmark": f"predict_batch[{name}]", "rows": size, **stats,
+                            "rows_per_second": size / (stats["p50_ms"] / 1000)})
+
+    for size in (1000, 1_000_000):
+        hours = rng.integers(0, 24, size)
+        days = np.asarray(DAYS, dtype=object)[rng.integers(0, 7, size)]
+        stats = time_call(lambda: open_mask(days, hours), repeat)
+        results.append({"benchmark": "open_mask", "rows": size, **stats,
+                        "rows_per_second": size / (stats["p50_ms"] / 1000)})
+
+    for r in results:
+        print(f"{r['benchmark']:<24} rows={r['rows']:<8} p50 {r['p50_ms']:.3f}ms  {r['rows_per_second']:,.0f} rows/s")
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the TTC ridership API")
+    parser.add_argument("--url", help="benchmark a running server instead of the in-process app")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--requests", type=int, default=200, help="requests per scenario (scaled down for big batches)")
+    parser.add_argument("--repeat", type=int, default=20, help="repetitions per micro-benchmark")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--skip-load", action="store_true", help="only run the micro-benchmarks")
+    parser.add_argument("--skip-micro", action="store_true", help="only run the HTTP load benchmarks")
+    parser.add_argument("--output", default="benchmark-results.json")
+    args = parser.parse_args()
+
+    pairs = station_line_pairs(pd.read_csv(DATA_PATH))
+    report = {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "target": args.url or "in-process",
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "seed": args.seed,
+    }
+    if not args.skip_load:
+        report["load"] = asyncio.run(load_benchmarks(args, pairs))
+    if not args.skip_micro:
+        report["micro"] = micro_benchmarks(pairs, args.repeat, args.seed)
+
+    Path(args.output).write_text(json.dumps(report, indent=2))
+    print(f"Saved results → {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+# Streaming ingestion of ridership CSVs into a compact, memory-mappable columnar cache
+#
+# The source is read in fixed-size chunks with explicit dtypes. Each chunk is cleaned (text normalized,
+# hour 24 -> 0, unparseable rows dropped), filtered to TTC service hours (ttc_rider_api/service_hours.py), then
+# appended column by column to raw binary files. Text columns are dictionary-encoded (small int codes + a
+# vocabulary in the manifest).
+# Memory use is bounded by the chunk size, not the file size.
+#
+# Later runs np.memmap the columns instead of re-parsing the CSV. The cache is rebuilt automatically when
+# the source file changes (size/mtime recorded in the manifest).
+#
+#   python scripts/ingest.py Ridership_Data.csv [--chunksize 1000000]
+
+import argparse, json, os, sys, time
+from pathlib import Path
+import numpy as np
+import pandas as pd
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from ttc_rider_api.service_hours import frame_open_mask
+
+CACHE_FORMAT = 1
+CHUNKSIZE = 1_000_000
+
+WEEKENDS = {"saturday", "sunday"}
+
+# Column -> on-disk dtype (text columns store dictionary codes)
+TEXT_COLUMNS = {"station": np.int16, "line": np.int16, "day": np.int8}
+NUMERIC_COLUMNS = {"hour": np.int8, "minute": np.int8, "riders": np.float32}
+
+# Explicit parse dtypes so pandas never has to infer (and never builds object columns for numbers)
+SOURCE_DTYPES = {"station": "string", "line": "string", "day": "string",
+                 "hour": "float32", "minute": "float32", "riders": "float32"}
+
+
+def cache_dir_for(source: Path) -> Path:
+    return source.parent / f"{source.stem}.cache"
+
+
+def _source_signature(source: Path) -> dict:
+    st = source.stat()
+    return {"path": str(source.resolve()), "size": st.st_size, "mtime_ns": st.st_mtime_ns, "format": CACHE_FORMAT}
+
+
+def clean_chunk(chunk: pd.DataFrame) -> pd.DataFrame:
+    """Normalize one raw chunk (lower-cased column names) and keep only rows inside service hours."""
+    chunk = chunk.dropna(subset=["station", "line", "day", "hour", "riders"])
+    out = pd.DataFrame({
+        "station": chunk["station"].str.strip(),
+        "line": chunk["line"].str.strip(),
+        "day": chunk["day"].str.lower().str.strip(),
+        "hour": chunk["hour"].replace(24, 0),
+        "minute": chunk["minute"].fillna(0) if "minute" in chunk else 0,
+        "riders": chunk["riders"],
+    })
+    return out[frame_open_mask(out)]
+
+
+def ingest(source: Path, cache_dir: Path | None = None, chunksize: int = CHUNKSIZE) -> Path:
+    """Stream `source` into the columnar cache and return the cache directory."""
+    cache_dir = cache_dir or cache_dir_for(source)
+    tmp_dir = cache_dir.with_name(cache_dir.name + f".{os.getpid()}.tmp")
+    tmp_dir.mkdir(parents=True, exist_ok=True)
+
+    # Map whatever case the header uses onto our lower-case names
+    header = pd.read_csv(source, nrows=0).columns
+    rename = {c: c.lower().strip() for c in header}
+    dtypes = {c: SOURCE_DTYPES[rename[c]] for c in header if rename[c] in SOURCE_DTYPES}
+    usecols = list(dtypes)
+
+    vocab: dict[str, dict[str, int]] = {c: {} for c in TEXT_COLUMNS}
+    files = {c: open(tmp_dir / f"{c}.bin", "wb") for c in [*TEXT_COLUMNS, *NUMERIC_COLUMNS]}
+    rows_in = rows_out = 0
+    t0 = time.perf_counter()
+    try:
+        for chunk in pd.read_csv(source, usecols=usecols, dtype=dtypes, chunksize=chunksize):
+            rows_in += len(chunk)
+            clean = clean_chunk(chunk.rename(columns=rename))
+            rows_out += len(clean)
+
+            for col, dtype in TEXT_COLUMNS.items():
+                values = clean[col]
+                index = vocab[col]
+                for v in pd.unique(values):
+                    index.setdefault(v, len(index))
+                files[col].write(values.map(index).to_numpy(dtype=dtype).tobytes())
+            for col, dtype in NUMERIC_COLUMNS.items():
+                files[col].write(np.asarray(clean[col], dtype=dtype).tobytes())
+    finally:
+        for f in files.values():
+            f.close()
+
+    manifest = {
+        "source": _source_signature(source),
+        "rows": rows_out,
+        "rows_read": rows_in,
+        "dtypes": {c: np.dtype(d).name for c, d in {**TEXT_COLUMNS, **NUMERIC_COLUMNS}.items()},
+        "vocab": {c: list(index) for c, index in vocab.items()},
+        "seconds": time.perf_counter() - t0,
+    }
+    (tmp_dir / "manifest.json").write_text(json.dumps(manifest, indent=2))
+
+    # Swap the finished cache into place so a concurrent reader never sees half-written columns
+    if cache_dir.exists():
+        for f in cache_dir.iterdir():
+            f.unlink()
+        cache_dir.rmdir()
+    tmp_dir.rename(cache_dir)
+    return cache_dir
+
+
+def cache_is_fresh(source: Path, cache_dir: Path) -> bool:
+    manifest = cache_dir / "manifest.json"
+    if not manifest.exists():
+        return False
+    return json.loads(manifest.read_text()).get("source") == _source_signature(source)
+
+
+def open_cache(cache_dir: Path) -> pd.DataFrame:
+    """Training frame backed by read-only memory maps of the cached columns (no CSV parsing)."""
+    manifest = json.loads((cache_dir / "manifest.json").read_text())
+    rows = manifest["rows"]
+    cols = {c: np.memmap(cache_dir / f"{c}.bin", dtype=d, mode="r", shape=(rows,)) if rows else np.empty(0, d)
+            for c, d in manifest["dtypes"].items()}
+
+    frame = {c: pd.Categorical.from_codes(cols[c], categories=manifest["vocab"][c]) for c in TEXT_COLUMNS}
+    frame.update({c: cols[c] for c in NUMERIC_COLUMNS})
+    df = pd.DataFrame(frame, copy=False)
+    df["is_weekend"] = df["day"].isin(list(WEEKENDS)).astype(np.int8)
+    return df
+
+
+def load_training_data(source: Path, chunksize: int = CHUNKSIZE) -> pd.DataFrame:
+    """Cleaned, service-hours-filtered rows of `source`, from the cache (re-ingesting first if it's stale)."""
+    cache_dir = cache_dir_for(source)
+    if not cache_is_fresh(source, cache_dir):
+        ingest(source, cache_dir, chunksize)
+    return open_cache(cache_dir)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Ingest a ridership CSV into the columnar training cache")
+    parser.add_argument("source", type=Path)
+    parser.add_argument("--chunksize", type=int, default=CHUNKSIZE)
+    parser.add_argument("--force", action="store_true", help="rebuild even if the cache is up to date")
+    args = parser.parse_args()
+
+    cache_dir = cache_dir_for(args.source)
+    if args.force or not cache_is_fresh(args.source, cache_dir):
+        ingest(args.source, cache_dir, args.chunksize)
+    manifest = json.loads((cache_dir / "manifest.json").read_text())
+    print(f"{manifest['rows']} rows kept of {manifest['rows_read']} read "
+          f"({manifest['seconds']:.2f}s ingest) → {cache_dir}")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,19 +2,19 @@ import joblib
 import pandas as pd
 import matplotlib.pyplot as plt
 from datetime import datetime
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from ttc_rider_api.service_hours import is_open
 
 # Load the trained model
 model = joblib.load("artifacts/model.joblib")
 
 # TTC operating hours function
 def TTC_Hours(day: str, hour: int) -> bool:
-    day = day.lower()
-    if day in ["saturday", "sunday"]:
-        # Weekends Hours (8:00 AM to 1:30 AM)
-        return (8 <= hour <= 23) or (hour in [0, 1])
-    else:
-        # Weekdays Hours (6:00 AM to 1:30 AM)
-        return (6 <= hour <= 23) or (hour in [0, 1])
+    # Shared schedule (weekdays 6:00 AM, weekends 8:00 AM, to 1:30 AM), see ttc_rider_api/service_hours.py
+    return is_open(day.lower(), hour)
 
 # Define target station/day
 station = "Finch"
@@ -23,22 +23,19 @@ day = "monday"
 
 # Generate all 24 hours (0–23)
 hours = list(range(0, 24))
-predictions = []
-
-for hour in hours:
-    if TTC_Hours(day, hour):
-        sample = pd.DataFrame([{
-            "station": station,
-            "line": line,
-            "day": day,
-            "hour": hour,
-            "minute": 0,
-            "is_weekend": 1 if day in ["saturday", "sunday"] else 0
-        }])
-        yhat = model.predict(sample)[0]
-    else:
-        yhat = 0  # Closed hours → 0 ridership
-    predictions.append(yhat)
+
+# One frame for the open hours, scored in a single predict call; closed hours → 0 ridership
+open_hours = [hour for hour in hours if TTC_Hours(day, hour)]
+sample = pd.DataFrame({
+    "station": station,
+    "line": line,
+    "day": day,
+    "hour": open_hours,
+    "minute": 0,
+    "is_weekend": 1 if day in ["saturday", "sunday"] else 0
+})
+by_hour = dict(zip(open_hours, model.predict(sample))) if open_hours else {}
+predictions = [by_hour.get(hour, 0) for hour in hours]
 
 # Create a DataFrame for plotting
 df_plot = pd.DataFrame({
@@ -0,0 +1,57 @@
+# Model definition shared by train.py and tune.py: feature lists, preprocessing and the XGBoost settings
+
+from sklearn.preprocessing import OneHotEncoder
+from sklearn.compose import ColumnTransformer
+from sklearn.pipeline import Pipeline
+from sklearn.impute import SimpleImputer
+
+# New ML Model: XGBoost
+from xgboost import XGBRegressor
+
+# Categorical features still go through OHE
+CAT_FEATURES = ["station", "line", "day"]
+
+# Give XGBoost the time signals + raw hour/minute + weekend flag
+NUM_FEATURES = ["hour", "minute", "is_weekend"]
+
+FEATURES = ["station", "line", "hour", "day", "minute", "is_weekend"]
+
+# XGBoost settings now instead of Linear Regression
+XGB_PARAMS = dict(
+    n_estimators=600,        # number of trees
+    max_depth=5,             # tree depth (controls complexity)
+    learning_rate=0.05,      # shrinkage
+    subsample=0.9,           # row sampling per tree
+    colsample_bytree=0.9,    # column sampling per tree
+    reg_lambda=1.0,          # L2 regularization
+    objective="reg:squarederror",
+    tree_method="hist",      # fast, memory-efficient CPU algorithm
+    n_jobs=-1,               # use all cores
+    random_state=42,
+)
+
+
+def make_preprocessor() -> ColumnTransformer:
+    cat_pipeline = Pipeline(steps=[
+        ("imputer", SimpleImputer(strategy="most_frequent")),
+        ("ohe", OneHotEncoder(handle_unknown="ignore", sparse_output=True)),
+    ])
+
+    num_pipeline = Pipeline(steps=[
+        ("imputer", SimpleImputer(strategy="mean")),
+    ])
+
+    return ColumnTransformer(
+        transformers=[
+            ("cat", cat_pipeline, CAT_FEATURES),
+            ("num", num_pipeline, NUM_FEATURES),
+        ]
+    )
+
+
+def make_pipeline(**xgb_overrides) -> Pipeline:
+    """Preprocessor + XGBRegressor; keyword arguments override XGB_PARAMS (e.g. a tuned config)."""
+    return Pipeline(steps=[
+        ("pre", make_preprocessor()),
+        ("reg", XGBRegressor(**{**XGB_PARAMS, **xgb_overrides})),
+    ])
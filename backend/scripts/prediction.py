@@ -4,6 +4,11 @@ import requests
 from dotenv import load_dotenv
 import os
 from datetime import datetime, timedelta
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from ttc_rider_api.service_hours import is_open
 
 # Loading the model
 model = joblib.load("artifacts/model.joblib")
@@ -61,13 +66,8 @@ if res_ticketmaster.status_code == 200:
         print(f"{date} {time} — {name} @ {venue} ({lat},{lon})")
 
 def TTC_Hours(day: str, hour: int) -> bool:
-    day = day.lower()
-    if day in ["saturday", "sunday"]:
-        # Weekends Hours (8:00 AM to 1:30 AM)
-        return (8 <= hour <= 23) or (hour in [0, 1])
-    else:
-        # Weekdays Hours (6:00 AM to 1:30 AM)
-        return (6 <= hour <= 23) or (hour in [0, 1])
+    # Shared schedule (weekdays 6:00 AM, weekends 8:00 AM, to 1:30 AM), see ttc_rider_api/service_hours.py
+    return is_open(day.lower(), hour)
 
 # Fetching prediciton from model
 sample = pd.DataFrame([{
@@ -0,0 +1,111 @@
+# Hourly ridership profiles for every station/line, every day, in one pass
+#
+# Builds the full station x day x hour grid, masks closed hours with the vectorized service-hours rule, scores
+# all open rows with a single model call (the same grid the API's prediction table uses), and writes every
+# profile to disk. With --plots, one bar chart per station/day is rendered across a process pool using the
+# non-interactive Agg backend.
+#
+# Run from backend/ (so artifacts/ resolves):
+#   python scripts/profiles.py --output profiles --plots --workers 8
+
+import argparse, os, sys, time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+import numpy as np
+import pandas as pd
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from ttc_rider_api.model import load_model
+from ttc_rider_api.booster import native_from_pipeline
+from ttc_rider_api.prediction_table import DATA_PATH, DAYS, HOURS, build_table, station_line_pairs
+
+
+def profiles_frame(table) -> pd.DataFrame:
+    """Long format: one row per (station, line, day, hour), closed hours included as 0 riders."""
+    n_pairs = len(table.stations)
+    pair_idx = np.repeat(np.arange(n_pairs), len(DAYS) * HOURS)
+    return pd.DataFrame({
+        "station": np.asarray(table.stations, dtype=object)[pair_idx],
+        "line": np.asarray(table.lines, dtype=object)[pair_idx],
+        "day": np.tile(np.repeat(np.asarray(DAYS, dtype=object), HOURS), n_pairs),
+        "hour": np.tile(np.arange(HOURS), n_pairs * len(DAYS)),
+        "riders": np.asarray(table.values, dtype=np.float32).reshape(-1),
+    })
+
+
+def _slug(text: str) -> str:
+    return "".join(c if c.isalnum() else "_" for c in text).strip("_").lower()
+
+
+def render_plots(jobs: list[tuple[str, str, str, np.ndarray]], out_dir: str) -> int:
+    """Worker: draw one bar chart per (station, line, day) profile. Runs in its own process."""
+    import matplotlib
+    matplotlib.use("Agg")  # no display needed, and safe to run in parallel
+    import matplotlib.pyplot as plt
+
+    # One figure per worker: only bar heights, title and y-limits change between profiles
+    fig = plt.figure()
+    bars = plt.bar(np.arange(HOURS), np.zeros(HOURS), width=0.8, align="center")
+    title = plt.title("Station (Line) — Estimated riders by hour (Day)")  # placeholder so the layout leaves room
+    plt.xlabel("Hour of day (24h)")
+    plt.ylabel("Predicted riders")
+    plt.xticks(range(0, 24, 2))
+    plt.grid(True, which="both", axis="y", linestyle="--", alpha=0.4)
+    ax = plt.gca()
+    fig.tight_layout()  # the layout doesn't change between profiles, so compute it once
+
+    for station, line, day, riders in jobs:
+        for bar, height in zip(bars, riders):
+            bar.set_height(height)
+        ax.set_ylim(0, max(float(np.max(riders)), 1.0) * 1.05)
+        title.set_text(f"{station} ({line}) — Estimated riders by hour ({day.title()})")
+        fig.savefig(Path(out_dir) / f"{_slug(station)}__{_slug(line)}__{day}.png", dpi=80)
+    plt.close(fig)
+    return len(jobs)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Write hourly ridership profiles for the whole network")
+    parser.add_argument("--output", type=Path, default=Path("profiles"))
+    parser.add_argument("--plots", action="store_true", help="also render one PNG per station/day")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--inference", choices=["native", "sklearn"], default="native")
+    args = parser.parse_args()
+
+    t0 = time.perf_counter()
+    pipe, meta = load_model()
+    model = native_from_pipeline(pipe, meta.get("model_version", "unknown")) if args.inference == "native" else pipe
+    stations, lines = station_line_pairs(pd.read_csv(DATA_PATH))
+
+    # Every station/line x 7 days x 24 hours, closed hours masked, scored in one model call
+    table = build_table(model, stations, lines, meta.get("model_version", "unknown"))
+    t_score = time.perf_counter() - t0
+
+    args.output.mkdir(parents=True, exist_ok=True)
+    long = profiles_frame(table)
+    long.to_csv(args.output / "profiles.csv", index=False)
+    # Wide view (one row per station/line/day, one column per hour) for spreadsheets
+    wide = long.pivot_table(index=["station", "line", "day"], columns="hour", values="riders", sort=False)
+    wide.to_csv(args.output / "profiles_wide.csv")
+    print(f"Scored {len(long)} station/day/hour cells in {t_score:.2f}s → {args.output / 'profiles.csv'}")
+
+    if args.plots:
+        t1 = time.perf_counter()
+        plot_dir = args.output / "plots"
+        plot_dir.mkdir(exist_ok=True)
+        jobs = [
+            (table.stations[p], table.lines[p], day, np.asarray(table.values[p, d]))
+            for p in range(len(table.stations))
+            for d, day in enumerate(DAYS)
+        ]
+        n_chunks = max(1, args.workers * 4)
+        chunks = [jobs[i::n_chunks] for i in range(n_chunks) if jobs[i::n_chunks]]
+        with ProcessPoolExecutor(max_workers=args.workers) as pool:
+            rendered = sum(pool.map(render_plots, chunks, [str(plot_dir)] * len(chunks)))
+        print(f"Rendered {rendered} plots in {time.perf_counter() - t1:.2f}s → {plot_dir}")
+
+    print(f"Total: {time.perf_counter() - t0:.2f}s (model {meta.get('model_version', 'unknown')})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,155 @@
+# Offline batch scoring: millions of (station, line, day, hour) rows without going through HTTP
+#
+# The input (CSV or Parquet) is read in fixed-size chunks. Each chunk is scored with the same steps as /predict:
+# closed hours are 0, known station/line pairs are read from the prediction table, and everything else goes
+# through the model in one vectorized call. Results are appended to the output as each chunk finishes, so
+# memory stays bounded by chunk size x in-flight chunks. With --workers > 1, chunks are scored in a process
+# pool (each worker loads the model + memory-maps the table once) and written back in input order.
+#
+# Run from backend/ (so artifacts/ resolves):
+#   python scripts/score.py planning_rows.csv scored.csv --chunksize 200000 --workers 4
+#
+# Parquet input/output needs pyarrow.
+
+import argparse, sys, time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+import numpy as np
+import pandas as pd
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from ttc_rider_api.model import load_model, predict_batch, records_frame
+from ttc_rider_api.service_hours import SERVICE
+from ttc_rider_api.booster import load_native_model
+from ttc_rider_api.prediction_table import load_table
+
+REQUIRED = ["station", "line", "day", "hour"]
+
+# Per-process model state, set once by _init_worker
+_model = _table = None
+
+
+def _init_worker(inference: str, use_table: bool):
+    global _model, _table
+    model, meta = load_model()
+    _model = load_native_model(model, meta) if inference == "native" else model
+    _table = load_table(_model, meta) if use_table else None
+
+
+def score_chunk(chunk: pd.DataFrame) -> pd.DataFrame:
+    """Input columns (any case) plus a riders column."""
+    cols = {c.lower().strip(): c for c in chunk.columns}
+    missing = [c for c in REQUIRED if c not in cols]
+    if missing:
+        raise ValueError(f"input is missing columns: {missing}")
+
+    stations = chunk[cols["station"]].astype(str).str.strip().to_numpy(dtype=object)
+    lines = chunk[cols["line"]].astype(str).str.strip().to_numpy(dtype=object)
+    days = chunk[cols["day"]].astype(str).str.lower().str.strip().to_numpy(dtype=object)
+    hours = pd.to_numeric(chunk[cols["hour"]], errors="coerce").fillna(-1).to_numpy(dtype=np.int64)
+
+    # Same rule as the API: closed hours are 0 riders and never reach the model. With a date column, the
+    # service calendar (holiday / extended service) decides instead of the weekly schedule.
+    riders = np.zeros(len(chunk), dtype=np.float32)
+    weekly = SERVICE.open_mask(days, hours)
+    if "date" in cols:
+        todo = SERVICE.open_mask_dates(chunk[cols["date"]], hours)
+    else:
+        todo = weekly
+
+    if _table is not None:
+        # The table stores 0 for every hour the weekly schedule closes, so hours opened only by the calendar
+        # (e.g. extended service until 04:00) must go to the model instead
+        table_riders, found = _table.lookup(stations, lines, days, hours)
+        from_table = todo & found & weekly
+        riders[from_table] = table_riders[from_table]
+        todo &= ~from_table
+
+    idx = np.flatnonzero(todo)
+    if idx.size:
+        riders[idx] = predict_batch(_model, records_frame(stations[idx], lines[idx], days[idx], hours[idx]))
+
+    return chunk.assign(riders=riders)
+
+
+def read_chunks(path: Path, chunksize: int):
+    if path.suffix.lower() == ".parquet":
+        import pyarrow.parquet as pq  # optional: only needed for Parquet input
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunksize):
+            yield batch.to_pandas()
+    else:
+        yield from pd.read_csv(path, chunksize=chunksize)
+
+
+class ChunkWriter:
+    """Appends scored chunks to a CSV or Parquet file."""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.parquet = path.suffix.lower() == ".parquet"
+        self._writer = None
+        self._first = True
+
+    def write(self, df: pd.DataFrame):
+        if self.parquet:
+            import pyarrow as pa, pyarrow.parquet as pq
+            table = pa.Table.from_pandas(df, preserve_index=False)
+            if self._writer is None:
+                self._writer = pq.ParquetWriter(self.path, table.schema)
+            self._writer.write_table(table)
+        else:
+            df.to_csv(self.path, mode="w" if self._first else "a", header=self._first, index=False)
+        self._first = False
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Score a CSV/Parquet of station/line/day/hour rows in bulk")
+    parser.add_argument("input", type=Path)
+    parser.add_argument("output", type=Path)
+    parser.add_argument("--chunksize", type=int, default=200_000)
+    parser.add_argument("--workers", type=int, default=1, help="processes scoring chunks in parallel")
+    parser.add_argument("--inference", choices=["native", "sklearn"], default="native")
+    parser.add_argument("--no-table", action="store_true", help="always run the model instead of reading the prediction table")
+    args = parser.parse_args()
+
+    writer = ChunkWriter(args.output)
+    rows = 0
+    t0 = time.perf_counter()
+
+    def report(scored: pd.DataFrame):
+        nonlocal rows
+        writer.write(scored)
+        rows += len(scored)
+        elapsed = time.perf_counter() - t0
+        print(f"{rows:>12,} rows  {rows / elapsed:>12,.0f} rows/s", file=sys.stderr)
+
+    try:
+        if args.workers <= 1:
+            _init_worker(args.inference, not args.no_table)
+            for chunk in read_chunks(args.input, args.chunksize):
+                report(score_chunk(chunk))
+        else:
+            # Bounded window of in-flight chunks: reading never runs far ahead of writing, and output keeps input order
+            with ProcessPoolExecutor(max_workers=args.workers, initializer=_init_worker,
+                                     initargs=(args.inference, not args.no_table)) as pool:
+                pending = deque()
+                for chunk in read_chunks(args.input, args.chunksize):
+                    pending.append(pool.submit(score_chunk, chunk))
+                    if len(pending) >= args.workers * 2:
+                        report(pending.popleft().result())
+                while pending:
+                    report(pending.popleft().result())
+    finally:
+        writer.close()
+
+    elapsed = time.perf_counter() - t0
+    print(f"Scored {rows:,} rows in {elapsed:.2f}s ({rows / max(elapsed, 1e-9):,.0f} rows/s) → {args.output}")
+
+
+if __name__ == "__main__":
+    main()
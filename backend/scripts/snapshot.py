@@ -0,0 +1,47 @@
+# Export the network snapshot (see ttc_rider_api/snapshot.py) as static files for the frontend map
+#
+# Writes one file per mode, named after the model version (network-<model_version>-<mode>.bin), plus a small
+# snapshot.json manifest pointing at them. The manifest is the only file that changes between models, so a static
+# host can cache the .bin files forever and the map fetches each one once.
+#
+# Run from backend/ (so artifacts/ resolves):
+#   python scripts/snapshot.py                                  # → artifacts/snapshots/
+#   python scripts/snapshot.py --output ../frontend/public/snapshots --mode bins
+
+import argparse, json, sys, time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from ttc_rider_api.model import load_model
+from ttc_rider_api.prediction_table import load_table
+from ttc_rider_api.snapshot import MODES, SNAPSHOT_DIR, network_snapshot, save_snapshot, snapshot_path
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export quantized, delta-encoded network snapshots")
+    parser.add_argument("--output", type=Path, default=SNAPSHOT_DIR, help="directory for the .bin files + manifest")
+    parser.add_argument("--mode", choices=[*MODES, "all"], default="all")
+    args = parser.parse_args()
+
+    t0 = time.perf_counter()
+    model, meta = load_model()
+    table = load_table(model, meta)
+    model_version = meta.get("model_version", "unknown")
+
+    # Keep entries for the other mode when only one is re-exported for the same model
+    manifest = args.output / "snapshot.json"
+    previous = json.loads(manifest.read_text()) if manifest.exists() else {}
+    files = previous.get("files", {}) if previous.get("model_version") == model_version else {}
+    for mode in MODES if args.mode == "all" else [args.mode]:
+        body = network_snapshot(model, meta, table, mode)
+        path = snapshot_path(model_version, mode, args.output)
+        save_snapshot(body, path)
+        files[mode] = path.name
+        print(f"Saved {mode} snapshot → {path} ({len(body):,} bytes, {table.values.size:,} values)")
+
+    manifest.write_text(json.dumps({"model_version": model_version, "files": files}, indent=2))
+    print(f"Manifest → {manifest} ({time.perf_counter() - t0:.2f}s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,17 +1,19 @@
 import pandas as pd
 import numpy as np
 from sklearn.model_selection import train_test_split
-from sklearn.preprocessing import OneHotEncoder, FunctionTransformer  
-from sklearn.compose import ColumnTransformer
-from sklearn.pipeline import Pipeline
 from sklearn.metrics import r2_score, mean_squared_error, mean_absolute_error
-from sklearn.impute import SimpleImputer  
-import joblib, json, time
+import argparse, hashlib, joblib, json, time, sys, os
 from pathlib import Path
 import matplotlib.pyplot as plt
 
-# New ML Model: XGBoost
-from xgboost import XGBRegressor
+# Lets the training script reuse the API's helpers (backend/ is the package root)
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from ttc_rider_api.prediction_table import TABLE_PATH, TABLE_INDEX_PATH, build_table, save_table, station_line_pairs
+from ttc_rider_api.options import OPTIONS_PATH, build_options, save_options
+from ttc_rider_api.booster import BOOSTER_PATH, FEATURE_MAP_PATH, export_booster, max_abs_difference, native_from_pipeline
+
+# New ML Model: XGBoost (pipeline definition shared with tune.py)
+from pipeline import FEATURES, make_pipeline
 
 # Functions to graph our results 
 #----------------------------------------------------------------------------------------------------------------------------
@@ -31,7 +33,7 @@ def hourly_profile_dataframe(station: str, line: str, day: str) -> pd.DataFrame:
         "hour":    hours,
         "minute":  [0] * len(hours),
     })
-    grid = grid[service_open_mask(grid)].copy()
+    grid = grid[frame_open_mask(grid)].copy()
     grid["is_weekend"] = grid["day"].isin(["saturday", "sunday"]).astype(int)
     return grid
 
@@ -51,113 +53,47 @@ def plot_station_day(pipe, station: str, line: str, day: str):
 
 #----------------------------------------------------------------------------------------------------------------------------
 
-# Data to determine open subway hours
-WEEKDAYS = {"monday", "tuesday", "wednesday", "thursday", "friday"}
-WEEKENDS = {"saturday", "sunday"}
-
-def service_open_mask(df_like: pd.DataFrame) -> pd.Series:
-    """
-    Row-aware mask using day_type, hour, and minute.
-    Mon–Fri: open 06:00–23:59 same day + 00:00–01:30 next day
-    Sat–Sun: open 08:00–23:59 same day + 00:00–01:30 next day
-    """
-    day = df_like["day"].astype(str).str.strip().str.lower()
-    h = pd.to_numeric(df_like["hour"], errors="coerce")
-    m = pd.to_numeric(df_like.get("minute", 0), errors="coerce").fillna(0)
-
-    # start hour depends on weekday/weekend
-    start_hour = np.where(day.isin(list(WEEKDAYS)), 6, 8)
-
-    same_day_open = (h >= start_hour) & (h <= 23)
-    after_midnight_open = (h == 0) | ((h == 1) & (m <= 30))
-
-    return same_day_open | after_midnight_open
+# Open subway hours come from the shared schedule in ttc_rider_api/service_hours.py
+from ingest import load_training_data
+from ttc_rider_api.service_hours import frame_open_mask, open_hours
 
 def hours_for_daytype(day_type: str) -> list[int]:
     """Whole-hour samples for plotting (01:00 included; 02:00 excluded)."""
-    start = 6 if day_type.lower() in WEEKDAYS else 8
-    return list(range(start, 24)) + [0, 1]
-
-df = pd.read_csv("Ridership_Data.csv")
-df.columns = df.columns.str.lower()
-
-# Basic cleaning / normalization see everything uppercase or lowercase is treated the same
-df["day"] = df["day"].str.lower().str.strip()
-df["station"] = df["station"].str.strip()
-df["line"] = df["line"].str.strip()
-
-# Features & target (station, line, hour, day, and is_weekend)
-X = df[["station", "line", "hour", "day"]].copy()
-y = df["riders"].astype(float) # Y value is the value we want to predict
-# Using the clean hour/minute directly from the CSV instead of old function
-X["hour"] = X["hour"].replace(24, 0)  
-X["minute"] = 0
-# Adding a weekend flag -> Trees love numeric signals, helping the model split weekday V weekend for more nodes
-X["is_weekend"] = X["day"].isin(["saturday", "sunday"]).astype(int)
+    return open_hours(day_type.lower())
 
-# Drop rows where hour couldn't be parsed at all
-X = X.dropna(subset=["hour"])
-y = y.loc[X.index].copy()
+# Full retrain (default) or incremental: keep boosting the saved model on a batch of new rows only
+parser = argparse.ArgumentParser(description="Train the TTC ridership model and write the API artifacts")
+parser.add_argument("--data", type=Path, default=Path("Ridership_Data.csv"), help="training CSV (full retrain)")
+parser.add_argument("--incremental", type=Path, metavar="NEW_CSV",
+                    help="continue boosting artifacts/model.joblib on only these new rows (category vocabulary stays fixed)")
+parser.add_argument("--rounds", type=int, default=100, help="trees to add in incremental mode")
+parser.add_argument("--params", type=Path, help="JSON of XGBoost overrides, e.g. artifacts/tuning/best_params.json from tune.py")
+args = parser.parse_args()
 
-# Filter to TTC service hours ONLY (day-aware; handles the 01:30 cutoff)
-mask = service_open_mask(X)
-n_before = len(X)
-n_after = int(mask.sum())
-print(f"DEBUG — rows after service-hours filter: {n_after} (from {n_before})")
-
-if n_after == 0:
-    print("WARNING — service-hours filter removed all rows. Falling back to [0..23].")
-    mask = X["hour"].between(0, 23, inclusive="both")
+# This section saves the model and metadata so the FastAPI API can load it later on 
+# Create a folder to save the model and info about it
+artifacts = Path("artifacts") 
+artifacts.mkdir(exist_ok=True)
 
-X = X[mask]
-y = y[mask]
+# Defines model path
+MODEL_PATH = artifacts / "model.joblib" # The trained model pipeline
+META_PATH  = artifacts / "meta.json" # Metadata about model
 
+# Streams the CSV in chunks into a compact columnar cache (cleaned + filtered to TTC service hours,
+# day-aware with the 01:30 cutoff) on the first run; later runs memory-map that cache instead of re-parsing
+df = load_training_data(args.incremental or args.data)
+print(f"DEBUG — rows after cleaning + service-hours filter: {len(df)}")
 
-if len(X) == 0:
+if len(df) == 0:
     raise RuntimeError(
-        "No rows left after hour parsing and fallback filter. "
-        "Check the 'hour' column format in the CSV — see DEBUG printouts above."
+        "No rows left after hour parsing and the service-hours filter. "
+        "Check the 'hour' column format in the CSV."
     )
 
-
-# Categorical features still go through OHE
-cat_features = ["station", "line", "day"]
-
-# Give XGBoost the time signals + raw hour/minute + weekend flag
-num_features = ["hour", "minute", "is_weekend"]
-
-cat_pipeline = Pipeline(steps=[
-    ("imputer", SimpleImputer(strategy="most_frequent")),    
-    ("ohe", OneHotEncoder(handle_unknown="ignore", sparse_output=True)),
-])
-
-num_pipeline = Pipeline(steps=[
-    ("imputer", SimpleImputer(strategy="mean")),        
-])
-
-pre = ColumnTransformer(
-    transformers=[
-        ("cat", cat_pipeline, cat_features),
-        ("num", num_pipeline, num_features),
-    ]
-)
-
-# Pipeline with XGBoost settings now instead of Linear Regression
-pipe = Pipeline(steps=[
-    ("pre", pre),
-    ("reg", XGBRegressor(
-        n_estimators=600,        # number of trees
-        max_depth=5,             # tree depth (controls complexity)
-        learning_rate=0.05,      # shrinkage
-        subsample=0.9,           # row sampling per tree
-        colsample_bytree=0.9,    # column sampling per tree
-        reg_lambda=1.0,          # L2 regularization
-        objective="reg:squarederror",
-        tree_method="hist",      # fast, memory-efficient CPU algorithm
-        n_jobs=-1,               # use all cores
-        random_state=42
-    ))
-])
+# Features & target (station, line, hour, day, minute and is_weekend — the weekend flag is added at ingestion,
+# trees love numeric signals, helping the model split weekday V weekend for more nodes)
+X = df[FEATURES]
+y = df["riders"].astype(float) # Y value is the value we want to predict
 
 
 # Train/test split
@@ -167,8 +103,41 @@ X_train, X_test, y_train, y_test = train_test_split(
     X, y, test_size=0.2, random_state=42
 )
 
-# Training
-pipe.fit(X_train, y_train)
+if args.incremental is None:
+    # Preprocessing + XGBoost settings live in pipeline.py (shared with tune.py); --params applies a tuned config
+    overrides = json.loads(args.params.read_text()) if args.params else {}
+    pipe = make_pipeline(**overrides)
+
+    # Training
+    t0 = time.perf_counter()
+    pipe.fit(X_train, y_train)
+    base_meta = None
+else:
+    # Warm start: reuse the fitted preprocessor as-is (OHE vocabulary stays fixed, unknown categories are
+    # ignored just like at serving time) and add --rounds trees on top of the existing booster
+    pipe = joblib.load(MODEL_PATH)
+    base_meta = json.loads(META_PATH.read_text()) if META_PATH.exists() else {"model_version": "unknown"}
+    reg = pipe.named_steps["reg"]
+    n_trees_before = reg.get_booster().num_boosted_rounds()
+
+    # Baseline: how the current model does on the new rows before it sees them
+    y_base = pipe.predict(X_test)
+    base_meta["metrics_on_new_data"] = {
+        "r2": float(r2_score(y_test, y_base)),
+        "rmse": float(np.sqrt(mean_squared_error(y_test, y_base))),
+        "mae": float(mean_absolute_error(y_test, y_base)),
+    }
+
+    # Kept so the added rounds can be refit on every new row once the held-out metrics are in (below)
+    base_booster = reg.get_booster().copy()
+
+    t0 = time.perf_counter()
+    reg.set_params(n_estimators=args.rounds)
+    reg.fit(pipe.named_steps["pre"].transform(X_train), y_train, xgb_model=reg.get_booster())
+    print(f"Incremental: {n_trees_before} → {reg.get_booster().num_boosted_rounds()} trees on {len(X_train)} new rows")
+
+train_seconds = time.perf_counter() - t0
+print(f"Training time: {train_seconds:.1f}s")
 
 # Evaluate
 y_pred = pipe.predict(X_test) # predicted ridership numbers for the test set
@@ -180,32 +149,85 @@ print(f"R²:  {r2:.3f}") # Measures the models variability
 print(f"RMSE:{rmse:.1f}") # Root Mean Squared Error (Error in predicitions)
 print(f"MAE: {mae:.1f}") # Mean Absoulte Error
 
-# This section saves the model and metadata so the FastAPI API can load it later on 
-# Create a folder to save the model and info about it
-artifacts = Path("artifacts") 
-artifacts.mkdir(exist_ok=True)
-
-# Defines model path
-MODEL_PATH = artifacts / "model.joblib" # The trained model pipeline
-META_PATH  = artifacts / "meta.json" # Metadata about model
+rows_trained = len(X_train)
+if args.incremental is not None:
+    # The 20% holdout only measures the update; the shipped model boosts the same rounds on all the new rows,
+    # so repeated incremental runs don't each throw away a fifth of their batch
+    t1 = time.perf_counter()
+    reg.fit(pipe.named_steps["pre"].transform(X), y, xgb_model=base_booster)
+    train_seconds += time.perf_counter() - t1
+    rows_trained = len(X)
+    # n_estimators was set to the increment; the saved params must describe the whole model
+    reg.set_params(n_estimators=reg.get_booster().num_boosted_rounds())
+    print(f"Refit the {args.rounds} added rounds on all {rows_trained} new rows")
+
+# Equivalence check: the native path must reproduce the sklearn pipeline on the held-out rows. Done on the
+# in-memory model before anything is written, so a failure leaves the previous artifact set untouched
+native_gap = max_abs_difference(pipe, native_from_pipeline(pipe, "candidate"), X_test)
+print(f"Native booster vs pipeline max |diff|: {native_gap:.6f} riders")
+if native_gap > 1e-2:
+    raise RuntimeError(f"Native booster predictions diverge from the pipeline (max |diff| = {native_gap})")
 
 # Saves Pipeline object into artifacts, where the API laods instead of retraining model every single time 
-joblib.dump(pipe, MODEL_PATH)
+# (left uncompressed on purpose: the API loads it with mmap_mode="r", which only works on uncompressed dumps)
+# Dump to a temp file and rename, so a running API that has the old file mapped keeps reading intact pages
+tmp_model = MODEL_PATH.with_suffix(".joblib.tmp")
+joblib.dump(pipe, tmp_model)
+# The version keys every API cache and ETag, so it must change whenever the model does: the timestamp alone
+# repeats for two runs in the same minute, the digest of the dumped pipeline doesn't
+model_digest = hashlib.sha256(tmp_model.read_bytes()).hexdigest()[:8]
+os.replace(tmp_model, MODEL_PATH)
 
 # Info about the model
 meta = {
-    "model_version": time.strftime("v%Y.%m.%d.%H%M"),
+    "model_version": time.strftime("v%Y.%m.%d.%H%M.") + model_digest,
     "features": ["station", "line", "day", "hour", "is_weekend"],
     "algo": "XGBoost + OHE(station/line/day) + time features (sin/cos, hour, minute, weekend)",
     "service_hours_rule": "Mon–Fri 06:00–01:30; Sat–Sun 08:00–01:30 (next day).",
     "metrics": {"r2": float(r2), "rmse": float(rmse), "mae": float(mae)},
+    "training": {
+        "mode": "full" if args.incremental is None else "incremental",
+        "source": str(args.incremental or args.data),
+        "rows": int(rows_trained),
+        "seconds": train_seconds,
+        "trees": int(pipe.named_steps["reg"].get_booster().num_boosted_rounds()),
+    },
 }
-
-# Saves info into JSON data
-META_PATH.write_text(json.dumps(meta, indent=2))
+if base_meta is not None:
+    # Incremental metrics above are on the held-out part of the new batch; keep the base model's score for comparison
+    meta["training"]["base_model_version"] = base_meta["model_version"]
+    meta["training"]["base_metrics_on_new_data"] = base_meta["metrics_on_new_data"]
+
+# Raw booster + frozen one-hot index for the API's native inference path
+export_booster(pipe, meta["model_version"])
+
+# Score every (station, line, day, hour) once so the API can serve /predict from lookups
+stations, lines = station_line_pairs(df)
+options = build_options(df)
+if args.incremental is not None:
+    # A new batch may not cover every station: keep everything the previous artifacts already served
+    if TABLE_INDEX_PATH.exists():
+        prev = json.loads(TABLE_INDEX_PATH.read_text())
+        stations, lines = map(list, zip(*sorted(set(zip(stations, lines)) | set(zip(prev["stations"], prev["lines"])))))
+    if OPTIONS_PATH.exists():
+        prev = json.loads(OPTIONS_PATH.read_text())
+        options = {k: sorted(set(options[k]) | set(prev.get(k, []))) for k in options}
+table = build_table(pipe, stations, lines, model_version=meta["model_version"])
+save_table(table, TABLE_PATH)
+
+# Dropdown vocabularies for /options, tied to this model version
+save_options(options, meta["model_version"])
+
+# Saves info into JSON data — written last: the API's reload watcher treats a new meta.json as "all artifacts ready"
+tmp_meta = META_PATH.with_suffix(".json.tmp")
+tmp_meta.write_text(json.dumps(meta, indent=2))
+os.replace(tmp_meta, META_PATH)
 
 print(f"Saved model → {MODEL_PATH}")
 print(f"Saved meta  → {META_PATH}")
+print(f"Saved table → {TABLE_PATH} {table.values.shape}")
+print(f"Saved options → {OPTIONS_PATH}")
+print(f"Saved booster → {BOOSTER_PATH} (+ {FEATURE_MAP_PATH})")
 
 # Visualization for Stations
 station_name = "Finch"
@@ -215,5 +237,5 @@ line = most_common_line_for_station(X_train.assign(station=X_train["station"]),
 plot_station_day(pipe, station_name, line, day="monday")
 plot_station_day(pipe, station_name, line, day="sunday")
 
-mask = service_open_mask(X)
+mask = frame_open_mask(X)
 print(X[mask]["hour"].unique())
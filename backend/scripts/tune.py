@@ -0,0 +1,165 @@
+# Hyperparameter search + K-fold cross-validation for the ridership model
+#
+# The OHE/preprocessed matrix is built once and shipped to each worker process once (pool initializer), then
+# reused by every fold of every trial. Trials run in parallel across a process pool, each with early stopping,
+# so the search also reports how many trees a config actually needs. Early stopping watches a slice carved out
+# of each fold's training rows (--stop-fraction), so the validation fold that gets scored stays untouched. The goal is the cheapest-to-serve config
+# (fewest trees x shallowest depth) that keeps R² at or above --min-r2.
+#
+# Every trial's params, per-fold metrics and wall time go to artifacts/tuning/trials.jsonl; the chosen config
+# goes to artifacts/tuning/best_params.json, which train.py accepts via --params.
+#
+#   python scripts/tune.py --search random --trials 40 --folds 5 --workers 4
+
+import argparse, itertools, json, os, random, time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+import numpy as np
+from sklearn.model_selection import KFold
+from sklearn.metrics import r2_score, mean_squared_error, mean_absolute_error
+from xgboost import XGBRegressor
+
+from ingest import load_training_data
+from pipeline import FEATURES, XGB_PARAMS, make_preprocessor
+
+GRID = {
+    "max_depth": [3, 4, 5, 6],
+    "learning_rate": [0.05, 0.1, 0.2],
+    "subsample": [0.8, 1.0],
+    "colsample_bytree": [0.8, 1.0],
+    "min_child_weight": [1, 5],
+}
+
+# Per-worker state, set once by the pool initializer
+_X = _y = _folds = None
+
+
+def _init_worker(X, y, folds):
+    global _X, _y, _folds
+    _X, _y, _folds = X, y, folds
+
+
+def run_trial(trial_id: int, params: dict, max_trees: int, early_stopping: int, n_jobs: int) -> dict:
+    t0 = time.perf_counter()
+    folds = []
+    for fit_idx, stop_idx, val_idx in _folds:
+        model = XGBRegressor(**{
+            **XGB_PARAMS,
+            **params,
+            "n_estimators": max_trees,
+            "early_stopping_rounds": early_stopping,
+            "n_jobs": n_jobs,
+        })
+        # Early stopping watches the held-back training slice; predict() then uses the best iteration only
+        model.fit(_X[fit_idx], _y[fit_idx], eval_set=[(_X[stop_idx], _y[stop_idx])], verbose=False)
+        pred = model.predict(_X[val_idx])
+        folds.append({
+            "r2": float(r2_score(_y[val_idx], pred)),
+            "rmse": float(np.sqrt(mean_squared_error(_y[val_idx], pred))),
+            "mae": float(mean_absolute_error(_y[val_idx], pred)),
+            "trees": int(model.best_iteration + 1),
+        })
+
+    trees = int(np.ceil(np.mean([f["trees"] for f in folds])))
+    return {
+        "trial": trial_id,
+        "params": params,
+        "r2": float(np.mean([f["r2"] for f in folds])),
+        "rmse": float(np.mean([f["rmse"] for f in folds])),
+        "mae": float(np.mean([f["mae"] for f in folds])),
+        "trees": trees,
+        # Serving cost proxy: inference walks every tree to its depth
+        "serving_cost": trees * params.get("max_depth", XGB_PARAMS["max_depth"]),
+        "folds": folds,
+        "seconds": time.perf_counter() - t0,
+    }
+
+
+def split_early_stopping(train_idx: np.ndarray, val_idx: np.ndarray, fraction: float, seed: int):
+    """(fit, early-stopping, validation) row indices: the early-stopping rows come out of the training side."""
+    shuffled = np.random.default_rng(seed).permutation(train_idx)
+    n_stop = max(1, int(round(len(shuffled) * fraction)))
+    return np.sort(shuffled[n_stop:]), np.sort(shuffled[:n_stop]), val_idx
+
+
+def candidate_params(search: str, trials: int, seed: int) -> list[dict]:
+    grid = [dict(zip(GRID, values)) for values in itertools.product(*GRID.values())]
+    if search == "grid":
+        return grid
+    rng = random.Random(seed)
+    return rng.sample(grid, min(trials, len(grid)))
+
+
+def pick_best(results: list[dict], min_r2: float) -> dict:
+    """Cheapest config that meets the accuracy bar; if none does, the most accurate one."""
+    good = [r for r in results if r["r2"] >= min_r2]
+    if good:
+        return min(good, key=lambda r: (r["serving_cost"], -r["r2"]))
+    return max(results, key=lambda r: r["r2"])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cross-validated hyperparameter search for the ridership model")
+    parser.add_argument("--data", type=Path, default=Path("Ridership_Data.csv"))
+    parser.add_argument("--search", choices=["grid", "random"], default="random")
+    parser.add_argument("--trials", type=int, default=30, help="configs to sample in random search")
+    parser.add_argument("--folds", type=int, default=5)
+    parser.add_argument("--max-trees", type=int, default=1000)
+    parser.add_argument("--early-stopping", type=int, default=50, help="rounds without improvement before stopping")
+    parser.add_argument("--stop-fraction", type=float, default=0.1,
+                        help="share of each fold's training rows held back for early stopping")
+    parser.add_argument("--min-r2", type=float, default=0.91)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", type=Path, default=Path("artifacts/tuning"))
+    args = parser.parse_args()
+
+    df = load_training_data(args.data)
+    # Preprocess once: the OHE matrix is identical for every fold and trial (as CSR, so row slicing is cheap)
+    X = make_preprocessor().fit_transform(df[FEATURES]).tocsr()
+    y = df["riders"].to_numpy(dtype=np.float32)
+    folds = [split_early_stopping(train_idx, val_idx, args.stop_fraction, args.seed)
+             for train_idx, val_idx in KFold(n_splits=args.folds, shuffle=True, random_state=args.seed).split(X)]
+
+    candidates = candidate_params(args.search, args.trials, args.seed)
+    # Split the cores between workers so XGBoost threads don't oversubscribe the machine
+    n_jobs = max(1, (os.cpu_count() or 1) // args.workers)
+    print(f"{len(candidates)} trials x {args.folds} folds on {X.shape[0]} rows x {X.shape[1]} features, "
+          f"{args.workers} workers x {n_jobs} threads")
+
+    args.output.mkdir(parents=True, exist_ok=True)
+    trials_path = args.output / "trials.jsonl"
+    t0 = time.perf_counter()
+    results = []
+    with open(trials_path, "w") as log, ProcessPoolExecutor(
+        max_workers=args.workers, initializer=_init_worker, initargs=(X, y, folds)
+    ) as pool:
+        futures = [pool.submit(run_trial, i, p, args.max_trees, args.early_stopping, n_jobs) for i, p in enumerate(candidates)]
+        for fut in as_completed(futures):
+            r = fut.result()
+            results.append(r)
+            log.write(json.dumps(r) + "\n")
+            log.flush()
+            print(f"trial {r['trial']:>3}  R² {r['r2']:.4f}  RMSE {r['rmse']:.1f}  trees {r['trees']:>4}  "
+                  f"{r['seconds']:.1f}s  {r['params']}")
+
+    best = pick_best(results, args.min_r2)
+    summary = {
+        "search": args.search,
+        "folds": args.folds,
+        "min_r2": args.min_r2,
+        "wall_seconds": time.perf_counter() - t0,
+        "trials": len(results),
+        "best": best,
+    }
+    (args.output / "summary.json").write_text(json.dumps(summary, indent=2))
+    (args.output / "best_params.json").write_text(json.dumps({**best["params"], "n_estimators": best["trees"]}, indent=2))
+
+    print(f"Best: R² {best['r2']:.4f} with {best['trees']} trees {best['params']} "
+          f"(default config uses {XGB_PARAMS['n_estimators']} trees at depth {XGB_PARAMS['max_depth']})")
+    print(f"Saved trials → {trials_path}")
+    print(f"Saved best   → {args.output / 'best_params.json'}")
+
+
+if __name__ == "__main__":
+    main()
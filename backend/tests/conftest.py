@@ -0,0 +1,18 @@
+# Tests run from backend/ like the API and scripts (artifacts/ and ttc_rider_api/Ridership-Data.csv are relative paths)
+# and use the committed model artifacts; nothing here writes to artifacts/.
+
+import os, sys
+from pathlib import Path
+import pytest
+
+BACKEND = Path(__file__).resolve().parents[1]
+sys.path.append(str(BACKEND))
+sys.path.append(str(BACKEND / "scripts"))
+os.chdir(BACKEND)
+
+
+@pytest.fixture(scope="session")
+def pipeline():
+    from ttc_rider_api.model import load_model
+    model, meta = load_model()
+    return model, meta
@@ -0,0 +1,69 @@
+# Native booster path (booster.NativeModel) must reproduce the sklearn pipeline, including the rows train.py's
+# held-out split never has: unknown categories (handle_unknown="ignore") and zero-valued numerics, which the
+# sparse one-hot output leaves absent, i.e. missing (zero_is_missing → NaN)
+
+import json
+import numpy as np
+import pytest
+
+from ttc_rider_api.booster import NativeModel, export_booster, max_abs_difference, native_from_pipeline
+from ttc_rider_api.model import predict_batch, records_frame
+
+TOLERANCE = 1e-2  # riders; same gate as train.py
+
+
+def frame(rows):
+    stations, lines, days, hours = zip(*rows)
+    return records_frame(list(stations), list(lines), list(days), list(hours))
+
+
+@pytest.fixture(scope="module")
+def native(pipeline):
+    model, meta = pipeline
+    return native_from_pipeline(model, meta["model_version"])
+
+
+def test_unknown_categories(pipeline, native):
+    X = frame([
+        ("Nowhere", "Line 1", "monday", 8),
+        ("Union", "Line 9", "monday", 8),
+        ("Union", "Line 1", "funday", 8),
+        ("Nowhere", "Line 9", "funday", 17),
+    ])
+    assert max_abs_difference(pipeline[0], native, X) < TOLERANCE
+
+
+def test_zero_numerics_are_missing(pipeline, native):
+    # hour=0 and is_weekend=0 (weekdays), with minute always 0: every numeric column takes the NaN path
+    X = frame([
+        ("Union", "Line 1", "monday", 0),
+        ("Bloor-Yonge", "Line 2", "friday", 0),
+        ("Nowhere", "Line 9", "tuesday", 0),
+        ("Finch", "Line 1", "sunday", 0),
+    ])
+    assert native.zero_is_missing
+    assert (X["minute"] == 0).all() and (X["is_weekend"] == 0).sum() == 3
+    assert max_abs_difference(pipeline[0], native, X) < TOLERANCE
+
+
+def test_full_grid_through_predict_batch(pipeline, native):
+    model = pipeline[0]
+    days = ["monday", "saturday", "holiday"]
+    rows = [(s, l, d, h) for s, l in [("Union", "Line 1"), ("Kipling", "Line 2"), ("Nowhere", "Line 1")]
+            for d in days for h in range(24)]
+    X = frame(rows)
+    np.testing.assert_allclose(predict_batch(native, X), predict_batch(model, X), atol=TOLERANCE)
+
+
+def test_exported_booster_round_trip(pipeline, tmp_path):
+    import xgboost as xgb
+
+    model, meta = pipeline
+    booster_path, map_path = tmp_path / "booster.ubj", tmp_path / "feature_map.json"
+    export_booster(model, meta["model_version"], booster_path, map_path)
+    booster = xgb.Booster()
+    booster.load_model(str(booster_path))
+    loaded = NativeModel(booster, json.loads(map_path.read_text()))
+
+    X = frame([("Union", "Line 1", "monday", 0), ("Nowhere", "Line 9", "sunday", 13), ("Finch", "Line 1", "friday", 8)])
+    assert max_abs_difference(model, loaded, X) < TOLERANCE
@@ -0,0 +1,33 @@
+# memo.VersionMemo: one entry per (model_version, key), replaced wholesale when the version changes
+
+import threading
+
+from ttc_rider_api.memo import VersionMemo
+
+
+def test_builds_once_per_version():
+    memo, calls = VersionMemo(), []
+    build = lambda: calls.append(1) or len(calls)
+    assert memo.get("v1", "a", build) == 1
+    assert memo.get("v1", "a", build) == 1
+    assert memo.get("v2", "a", build) == 2  # new version: old entries are gone
+    assert len(memo) == 1
+
+
+def test_concurrent_misses_across_versions():
+    memo, errors = VersionMemo(), []
+
+    def worker(n):
+        try:
+            for i in range(2000):
+                version = f"v{(i // 100) % 3}"
+                assert memo.get(version, (n, i % 7), lambda: (version, n, i % 7)) == (version, n, i % 7)
+        except Exception as e:  # "dictionary changed size during iteration", stale values, ...
+            errors.append(e)
+
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert not errors
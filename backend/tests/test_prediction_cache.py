@@ -0,0 +1,51 @@
+# prediction_cache.SharedCache: one round trip per batch, and a broken backend degrades to misses
+
+from ttc_rider_api.prediction_cache import InMemoryKV, SharedCache, make_key
+
+
+class CountingKV(InMemoryKV):
+    def __init__(self):
+        super().__init__()
+        self.round_trips = 0
+
+    def mget(self, keys):
+        self.round_trips += 1
+        return super().mget(keys)
+
+    def pipeline(self, transaction=True):
+        pipe = super().pipeline(transaction)
+        execute = pipe.execute
+
+        def counted():
+            self.round_trips += 1
+            return execute()
+
+        pipe.execute = counted
+        return pipe
+
+
+class DownKV:
+    def mget(self, keys):
+        raise ConnectionError("connection refused")
+
+    def pipeline(self, transaction=True):
+        raise ConnectionError("connection refused")
+
+
+def test_batch_is_one_round_trip():
+    kv = CountingKV()
+    cache = SharedCache(kv, ttl=60)
+    keys = [make_key("v1", "Union", "Line 1", "monday", h) for h in range(24)]
+    cache.set_many([(k, float(i)) for i, k in enumerate(keys)])
+    assert cache.get_many(keys) == [float(i) for i in range(24)]
+    assert kv.round_trips == 2
+    assert cache.stats()["hits"] == 24
+
+
+def test_unreachable_backend_is_a_miss():
+    cache = SharedCache(DownKV())
+    keys = [make_key("v1", "Union", "Line 1", "monday", 8)]
+    assert cache.get_many(keys) == [None]
+    cache.set_many([(keys[0], 1.0)])  # logged, not raised
+    stats = cache.stats()
+    assert stats["misses"] == 1 and stats["errors"] == 2
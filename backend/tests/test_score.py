@@ -0,0 +1,42 @@
+# scripts/score.py: chunk scoring must agree with the model wherever the service calendar differs from the weekly table
+
+import pandas as pd
+import pytest
+
+import score
+from ttc_rider_api.model import predict_batch, records_frame
+from ttc_rider_api.prediction_table import build_table
+from ttc_rider_api.service_hours import ServiceHours
+
+
+@pytest.fixture
+def scorer(pipeline, monkeypatch):
+    model, meta = pipeline
+    table = build_table(model, ["Union"], ["Line 1"], meta["model_version"])  # in memory, no artifacts written
+    monkeypatch.setattr(score, "_model", model)
+    monkeypatch.setattr(score, "_table", table)
+    # Friday 2026-10-16 runs extended service until 04:00
+    monkeypatch.setattr(score, "SERVICE", ServiceHours(calendar={"2026-10-16": {"close": "04:00"}}))
+    return model
+
+
+def test_calendar_opened_hours_use_the_model(scorer):
+    chunk = pd.DataFrame({
+        "station": ["Union", "Union", "Union"],
+        "line": ["Line 1", "Line 1", "Line 1"],
+        "day": ["friday", "friday", "friday"],
+        "hour": [2, 8, 2],
+        "date": ["2026-10-16", "2026-10-16", "2026-10-23"],
+    })
+    riders = score.score_chunk(chunk)["riders"].to_numpy()
+    expected = predict_batch(scorer, records_frame(["Union"] * 2, ["Line 1"] * 2, ["friday"] * 2, [2, 8]))
+
+    assert riders[0] == pytest.approx(expected[0], rel=1e-5) and riders[0] > 0  # extended service: model, not the table's 0
+    assert riders[1] == pytest.approx(expected[1], rel=1e-5)                     # regular hour: table
+    assert riders[2] == 0                                                        # a normal Friday is closed at 02:00
+
+
+def test_weekly_schedule_without_dates(scorer):
+    chunk = pd.DataFrame({"station": ["Union"] * 2, "line": ["Line 1"] * 2, "day": ["friday"] * 2, "hour": [2, 8]})
+    riders = score.score_chunk(chunk)["riders"].to_numpy()
+    assert riders[0] == 0 and riders[1] > 0
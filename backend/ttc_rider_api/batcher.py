@@ -0,0 +1,104 @@
+# Micro-batching scheduler for model inference
+# Concurrent /predict requests each used to make their own small model.predict call, all fighting over the GIL and
+# XGBoost's thread pool. Here rows from requests arriving within a short window (max_wait seconds, or until max_rows
+# is reached) are merged into one frame, scored in a single call on a dedicated inference thread, and each
+# request gets its own slice of the result back. Preprocess/predict are timed on the inference thread and handed
+# back to each request's profiling timer; the rest of its wait is charged to "batch_wait".
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import pandas as pd
+
+from ttc_rider_api.model import predict_batch
+from ttc_rider_api import profiling
+from ttc_rider_api.profiling import NULL_TIMER
+
+
+def _score(model, frames: list[pd.DataFrame]) -> tuple[np.ndarray, dict[str, float]]:
+    """Predictions for the merged frames, plus the batch's stage timings (empty when profiling is off)."""
+    timer = profiling.timer(0)
+    frame = frames[0] if len(frames) == 1 else pd.concat(frames, ignore_index=True)
+    preds = np.asarray(predict_batch(model, frame, timer), dtype=float)
+    return preds, timer.stages
+
+
+class MicroBatcher:
+    def __init__(self, max_wait: float = 0.002, max_rows: int = 4096):
+        self.max_wait = max_wait
+        self.max_rows = max_rows
+        # One thread: batches run back to back and XGBoost gets the cores to itself
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="inference")
+        self._pending: list[tuple[object, pd.DataFrame, asyncio.Future]] = []
+        self._rows = 0
+        self._flush_handle: asyncio.TimerHandle | None = None
+        # Strong references to in-flight batches (the loop only keeps weak ones), also awaited at shutdown
+        self._tasks: set[asyncio.Task] = set()
+        self.batches = 0
+        self.requests = 0
+
+    async def predict(self, model, frame: pd.DataFrame, timer=NULL_TIMER) -> np.ndarray:
+        loop = asyncio.get_running_loop()
+        if self.max_wait <= 0:
+            self.batches += 1
+            self.requests += 1
+            preds, stages = await loop.run_in_executor(self.executor, _score, model, [frame])
+        else:
+            fut = loop.create_future()
+            self._pending.append((model, frame, fut))
+            self._rows += len(frame)
+            if self._rows >= self.max_rows:
+                self._flush(loop)
+            elif self._flush_handle is None:
+                self._flush_handle = loop.call_later(self.max_wait, self._flush, loop)
+            preds, stages = await fut
+        timer.charge(stages, "batch_wait")
+        return preds
+
+    def _flush(self, loop: asyncio.AbstractEventLoop):
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        pending, self._pending, self._rows = self._pending, [], 0
+
+        # Group by model object: a hot reload can leave two model versions in the same window
+        groups: dict[int, tuple[object, list]] = {}
+        for model, frame, fut in pending:
+            groups.setdefault(id(model), (model, []))[1].append((frame, fut))
+        for model, items in groups.values():
+            task = loop.create_task(self._run(loop, model, items))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, loop: asyncio.AbstractEventLoop, model, items: list[tuple[pd.DataFrame, asyncio.Future]]):
+        self.batches += 1
+        self.requests += len(items)
+        try:
+            preds, stages = await loop.run_in_executor(self.executor, _score, model, [frame for frame, _ in items])
+        except Exception as e:
+            for _, fut in items:
+                if not fut.done():
+                    fut.set_exception(e)
+            return
+
+        offset = 0
+        for frame, fut in items:
+            if not fut.done():  # the request may have been cancelled (client went away)
+                fut.set_result((preds[offset:offset + len(frame)], stages))
+            offset += len(frame)
+
+    def stats(self) -> dict:
+        return {
+            "max_wait_ms": self.max_wait * 1000,
+            "max_rows": self.max_rows,
+            "batches": self.batches,
+            "requests": self.requests,
+        }
+
+    async def shutdown(self):
+        """Score anything still queued, wait for in-flight batches, then stop the inference thread."""
+        if self._pending:
+            self._flush(asyncio.get_running_loop())
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+        self.executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,105 @@
+# Native XGBoost serving path: raw booster + frozen one-hot index instead of the sklearn ColumnTransformer
+# train.py exports booster.ubj and feature_map.json next to model.joblib. At serving time, rows are encoded
+# straight into a preallocated float32 matrix and scored with Booster.inplace_predict, which skips
+# sklearn's per-call validation and pandas overhead.
+
+import json
+import numpy as np
+import pandas as pd
+
+from ttc_rider_api.model import ARTIFACTS
+
+BOOSTER_PATH = ARTIFACTS / "booster.ubj"
+FEATURE_MAP_PATH = ARTIFACTS / "feature_map.json"
+
+
+def feature_map_from_pipeline(pipe, model_version: str) -> dict:
+    """Freeze the fitted ColumnTransformer layout: category -> output column, numeric feature -> column."""
+    pre = pipe.named_steps["pre"]
+    cat_cols, num_cols = [], []
+    for name, _, cols in pre.transformers_:
+        if name == "cat":
+            cat_cols = list(cols)
+        elif name == "num":
+            num_cols = list(cols)
+
+    ohe = pre.named_transformers_["cat"].named_steps["ohe"]
+    categorical, col = {}, 0
+    for feature, cats in zip(cat_cols, ohe.categories_):
+        categorical[feature] = {str(c): col + i for i, c in enumerate(cats)}
+        col += len(cats)
+    numeric = {feature: col + i for i, feature in enumerate(num_cols)}
+
+    return {
+        "model_version": model_version,
+        "categorical": categorical,
+        "numeric": numeric,
+        "n_features": col + len(num_cols),
+        # Sparse output means XGBoost never saw explicit zeros: an absent entry is "missing", not 0
+        "zero_is_missing": bool(pre.sparse_output_),
+    }
+
+
+def export_booster(pipe, model_version: str, booster_path=BOOSTER_PATH, feature_map_path=FEATURE_MAP_PATH):
+    pipe.named_steps["reg"].get_booster().save_model(str(booster_path))
+    feature_map_path.write_text(json.dumps(feature_map_from_pipeline(pipe, model_version), indent=2))
+
+
+class NativeModel:
+    """Drop-in for the sklearn pipeline in predict_batch: encode(df) then predict_encoded(X)."""
+
+    def __init__(self, booster, feature_map: dict):
+        self.booster = booster
+        self.feature_map = feature_map
+        self.categorical = feature_map["categorical"]
+        self.numeric = feature_map["numeric"]
+        self.n_features = feature_map["n_features"]
+        self.zero_is_missing = feature_map["zero_is_missing"]
+
+    def encode(self, df: pd.DataFrame) -> np.ndarray:
+        n = len(df)
+        fill = np.nan if self.zero_is_missing else 0.0
+        X = np.full((n, self.n_features), fill, dtype=np.float32)
+        rows = np.arange(n)
+
+        # One hot: unknown categories map to -1 and leave the row's block empty (handle_unknown="ignore")
+        for feature, index in self.categorical.items():
+            cols = df[feature].astype(str).map(index).fillna(-1).to_numpy(dtype=np.int64)
+            known = cols >= 0
+            X[rows[known], cols[known]] = 1.0
+
+        for feature, col in self.numeric.items():
+            values = df[feature].to_numpy(dtype=np.float32)
+            if self.zero_is_missing:
+                values = np.where(values == 0, np.nan, values)
+            X[:, col] = values
+        return X
+
+    def predict_encoded(self, X: np.ndarray) -> np.ndarray:
+        return self.booster.inplace_predict(X, missing=np.nan)
+
+    def predict(self, df: pd.DataFrame) -> np.ndarray:
+        return self.predict_encoded(self.encode(df))
+
+
+def native_from_pipeline(pipe, model_version: str) -> NativeModel:
+    return NativeModel(pipe.named_steps["reg"].get_booster(), feature_map_from_pipeline(pipe, model_version))
+
+
+def load_native_model(pipe, meta: dict) -> NativeModel:
+    """Load the exported booster for this model version, or derive it from the in-memory pipeline."""
+    model_version = meta.get("model_version", "unknown")
+    if BOOSTER_PATH.exists() and FEATURE_MAP_PATH.exists():
+        feature_map = json.loads(FEATURE_MAP_PATH.read_text())
+        if feature_map.get("model_version") == model_version:
+            import xgboost as xgb  # deferred: only the serving startup path needs it, not module import
+
+            booster = xgb.Booster()
+            booster.load_model(str(BOOSTER_PATH))
+            return NativeModel(booster, feature_map)
+    return native_from_pipeline(pipe, model_version)
+
+
+def max_abs_difference(pipe, native: NativeModel, X: pd.DataFrame) -> float:
+    """Largest gap between the sklearn pipeline and the native path on the same rows (equivalence check)."""
+    return float(np.max(np.abs(pipe.predict(X) - native.predict(X)), initial=0.0))
@@ -0,0 +1,109 @@
+# Response compression: brotli (if installed and accepted) or gzip, for JSON / binary bodies above a size threshold
+#
+# A plain ASGI middleware: the (fully buffered) response body is compressed once, Content-Length/-Encoding and
+# Vary are set, and the ETag gets an encoding suffix so each representation keeps a distinct strong validator.
+# Bodies with an ETag are deterministic, so their compressed bytes are memoized (small LRU) and repeat requests
+# for the same heatmap/forecast skip recompression. Streaming responses pass through untouched.
+
+from collections import OrderedDict
+import gzip, os
+
+from starlette.datastructures import Headers, MutableHeaders
+
+from ttc_rider_api.http_cache import variant_etag
+
+try:
+    import brotli
+except ImportError:  # optional, see requirements.txt; gzip is always available
+    brotli = None
+
+MIN_SIZE = int(os.getenv("TTC_COMPRESS_MIN_BYTES", "1024"))
+COMPRESSIBLE = ("application/json", "application/x-ttc-tensor", "application/x-ttc-snapshot", "text/")
+MEMO_SIZE = 256
+
+
+def choose_encoding(accept_encoding: str) -> str | None:
+    """Best supported encoding the client accepts (q=0 means "not acceptable")."""
+    accepted = {}
+    for item in accept_encoding.lower().split(","):
+        name, _, params = item.strip().partition(";")
+        q = 1.0
+        if params.strip().startswith("q="):
+            try:
+                q = float(params.strip()[2:])
+            except ValueError:
+                q = 0.0
+        accepted[name.strip()] = q
+    if brotli is not None and accepted.get("br", 0) > 0:
+        return "br"
+    if accepted.get("gzip", accepted.get("*", 0)) > 0:
+        return "gzip"
+    return None
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=5)
+    return gzip.compress(body, compresslevel=6, mtime=0)  # mtime=0: same input, same bytes
+
+
+class CompressionMiddleware:
+    def __init__(self, app, minimum_size: int = MIN_SIZE):
+        self.app = app
+        self.minimum_size = minimum_size
+        self._memo: OrderedDict[tuple[str, str], bytes] = OrderedDict()
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        # Even without a usable encoding the response still goes through, so it gets its Vary header
+        encoding = choose_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        start = None
+        streaming = False
+
+        async def send_wrapper(message):
+            nonlocal start, streaming
+            if message["type"] == "http.response.start":
+                start = message
+                return
+            if message["type"] != "http.response.body" or streaming:
+                await send(message)
+                return
+            if message.get("more_body", False):
+                streaming = True
+                await send(start)
+                await send(message)
+                return
+            await self._send_buffered(send, start, message.get("body", b""), encoding)
+
+        await self.app(scope, receive, send_wrapper)
+
+    async def _send_buffered(self, send, start: dict, body: bytes, encoding: str | None):
+        headers = MutableHeaders(raw=start["headers"])
+        compressible = headers.get("content-type", "").startswith(COMPRESSIBLE)
+        if compressible:
+            headers.add_vary_header("Accept-Encoding")
+        if (encoding is None or not compressible or start["status"] != 200 or "content-encoding" in headers
+                or len(body) < self.minimum_size):
+            await send(start)
+            await send({"type": "http.response.body", "body": body})
+            return
+
+        etag = headers.get("etag")
+        key = (etag, encoding) if etag else None
+        compressed = self._memo.get(key) if key else None
+        if compressed is None:
+            compressed = compress(body, encoding)
+            if key:
+                self._memo[key] = compressed
+                if len(self._memo) > MEMO_SIZE:
+                    self._memo.popitem(last=False)
+        else:
+            self._memo.move_to_end(key)
+
+        headers["Content-Encoding"] = encoding
+        headers["Content-Length"] = str(len(compressed))
+        if etag:
+            headers["ETag"] = variant_etag(etag, encoding)
+        await send(start)
+        await send({"type": "http.response.body", "body": compressed})
@@ -0,0 +1,46 @@
+# Fast JSON encoding for large responses built from NumPy arrays
+# orjson serializes NumPy buffers natively (no .tolist() round trip); if it is not installed we fall back to json.
+
+import json, struct
+import numpy as np
+
+try:
+    import orjson
+except ImportError:  # optional speed-up, see requirements.txt
+    orjson = None
+
+
+def _default(obj):
+    if isinstance(obj, np.ndarray):
+        return obj.tolist()
+    if isinstance(obj, np.generic):
+        return obj.item()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def dumps(obj) -> bytes:
+    """Compact JSON bytes; NumPy arrays/scalars are allowed anywhere in obj."""
+    if orjson is not None:
+        return orjson.dumps(obj, default=_default, option=orjson.OPT_SERIALIZE_NUMPY)
+    return json.dumps(obj, default=_default, separators=(",", ":")).encode()
+
+
+# Packed tensor: 4-byte little-endian header length, JSON header (dtype, shape, labels) padded with spaces to a
+# multiple of 4 bytes, then the raw little-endian float32 values in C order. A browser reads it with one
+# DataView + `new Float32Array(buf, 4 + headerLength)`, no parsing of the numbers at all.
+TENSOR_MEDIA_TYPE = "application/x-ttc-tensor"
+
+
+def pack_tensor(values: np.ndarray, header: dict) -> bytes:
+    values = np.ascontiguousarray(values, dtype="<f4")
+    head = dumps({**header, "dtype": "float32", "shape": list(values.shape)})
+    head += b" " * (-(len(head) + 4) % 4)  # keep the float32 data 4-byte aligned
+    return struct.pack("<I", len(head)) + head + values.tobytes()
+
+
+def unpack_tensor(body: bytes) -> tuple[dict, np.ndarray]:
+    """Inverse of pack_tensor (for Python clients and scripts)."""
+    (n,) = struct.unpack_from("<I", body)
+    header = json.loads(body[4:4 + n])
+    values = np.frombuffer(body, dtype="<f4", offset=4 + n).reshape(header["shape"])
+    return header, values
@@ -0,0 +1,198 @@
+# Weather + venue event features for the API, fetched in the background and served from memory
+#
+# scripts/weather+events.py makes blocking requests.get calls with no timeout, retry or caching. Here both
+# sources are fetched concurrently over one pooled async HTTP client, cached with their own TTLs (weather
+# hourly, events daily), and refreshed by a background task. Request handlers only ever read the latest
+# snapshot, so /predict never waits on an external API. If a refresh fails, the last good value is kept.
+#
+# Each events refresh also rebuilds the per-station event load table (geo.py), so lookups stay O(1) per record.
+#
+# Providers are pluggable: HttpProvider talks to weatherapi.com + Ticketmaster, FakeProvider returns fixed
+# data so everything runs offline (TTC_FEATURES=fake).
+
+import asyncio, logging, os, time
+from datetime import date, datetime
+
+from ttc_rider_api.geo import EventLoadTable, event_load, load_geo
+
+log = logging.getLogger("ttc_rider_api.enrichment")
+
+# Ticketmaster venue ids → (name, max capacity)
+VENUES = {
+    "KovZpZAFFE1A": ("Scotiabank Arena", 20000),
+    "KovZpZAEkkIA": ("Budweiser Stage", 17000),
+    "KovZpa3Bbe": ("Rogers Centre", 40000),
+    "KovZpZAE77aA": ("BMO Field", 30000),
+    "KovZpZAEdJIA": ("Sobeys Stadium", 12500),
+    "KovZpZAFFEJA": ("Meridian Hall", 3200),
+    "KovZpZAFnlnA": ("Massey Hall", 2800),
+    "KovZpZAJt7FA": ("Coca-Cola Coliseum", 9000),
+}
+
+WEATHER_URL = "http://api.weatherapi.com/v1/current.json"
+EVENTS_URL = "https://app.ticketmaster.com/discovery/v2/events.json"
+
+WEATHER_TTL = 3600     # seconds
+EVENTS_TTL = 86400
+
+
+def parse_events(payload: dict) -> list[dict]:
+    """Flatten a Ticketmaster discovery response into the fields we use."""
+    out = []
+    for e in payload.get("_embedded", {}).get("events", []):
+        venue = e.get("_embedded", {}).get("venues", [{}])[0]
+        location = venue.get("location", {})
+        start = e.get("dates", {}).get("start", {})
+        venue_id = venue.get("id")
+        out.append({
+            "name": e.get("name"),
+            "date": start.get("localDate"),
+            "time": start.get("localTime"),
+            "venue": venue.get("name"),
+            "venue_id": venue_id,
+            "latitude": float(location["latitude"]) if location.get("latitude") else None,
+            "longitude": float(location["longitude"]) if location.get("longitude") else None,
+            "capacity": VENUES.get(venue_id, (None, None))[1],
+        })
+    return out
+
+
+class HttpProvider:
+    """weatherapi.com + Ticketmaster over one pooled httpx.AsyncClient (timeouts + retries)."""
+
+    def __init__(self, weather_key: str | None, ticketmaster_key: str | None, timeout: float = 5.0, retries: int = 2):
+        import httpx  # only needed when the live provider is enabled
+
+        self.weather_key = weather_key
+        self.ticketmaster_key = ticketmaster_key
+        self.retries = retries
+        self.client = httpx.AsyncClient(
+            timeout=timeout,
+            limits=httpx.Limits(max_connections=10, max_keepalive_connections=5),
+        )
+
+    async def _get_json(self, url: str, params: dict) -> dict:
+        for attempt in range(self.retries + 1):
+            try:
+                res = await self.client.get(url, params=params)
+                res.raise_for_status()
+                return res.json()
+            except Exception:
+                if attempt == self.retries:
+                    raise
+                await asyncio.sleep(0.5 * 2 ** attempt)
+
+    async def fetch_weather(self) -> dict:
+        data = await self._get_json(WEATHER_URL, {"key": self.weather_key, "q": "Toronto"})
+        return {"temp_c": data["current"]["temp_c"], "condition": data["current"]["condition"]["text"]}
+
+    async def fetch_events(self, day: date) -> list[dict]:
+        data = await self._get_json(EVENTS_URL, {
+            "apikey": self.ticketmaster_key,
+            "venueId": ",".join(VENUES),
+            "startDateTime": f"{day}T00:00:00Z",
+            "endDateTime": f"{day}T23:59:59Z",
+            "size": 100,
+        })
+        return parse_events(data)
+
+    async def aclose(self):
+        await self.client.aclose()
+
+
+class FakeProvider:
+    """Offline stand-in with fixed weather and events; counts calls so tests can check caching."""
+
+    def __init__(self, weather: dict | None = None, events: list[dict] | None = None):
+        self.weather = weather or {"temp_c": 12.0, "condition": "Partly cloudy"}
+        self.events = events if events is not None else [{
+            "name": "Sample game", "date": None, "time": "19:00:00", "venue": "Scotiabank Arena",
+            "venue_id": "KovZpZAFFE1A", "latitude": 43.6435, "longitude": -79.3791, "capacity": 20000,
+        }]
+        self.weather_calls = 0
+        self.event_calls = 0
+
+    async def fetch_weather(self) -> dict:
+        self.weather_calls += 1
+        return dict(self.weather)
+
+    async def fetch_events(self, day: date) -> list[dict]:
+        self.event_calls += 1
+        return [{**e, "date": e.get("date") or str(day)} for e in self.events]
+
+    async def aclose(self):
+        pass
+
+
+class FeatureStore:
+    """Latest weather/events snapshot with per-source TTLs; refreshed off the request path."""
+
+    def __init__(self, provider, weather_ttl: float = WEATHER_TTL, events_ttl: float = EVENTS_TTL):
+        self.provider = provider
+        self.weather_ttl = weather_ttl
+        self.events_ttl = events_ttl
+        self.weather: dict | None = None
+        self.events: list[dict] | None = None
+        self.event_load: EventLoadTable | None = None
+        self._geo = None
+        self._weather_at = 0.0           # monotonic time of the last successful fetch
+        self._events_day: date | None = None
+        self._events_at = 0.0
+        self.errors = 0
+
+    def _weather_stale(self) -> bool:
+        return self.weather is None or time.monotonic() - self._weather_at >= self.weather_ttl
+
+    def _events_stale(self, today: date) -> bool:
+        return self.events is None or self._events_day != today or time.monotonic() - self._events_at >= self.events_ttl
+
+    async def _refresh_weather(self):
+        self.weather = {**await self.provider.fetch_weather(), "fetched_at": datetime.now().isoformat(timespec="seconds")}
+        self._weather_at = time.monotonic()
+
+    async def _refresh_events(self, today: date):
+        events = await self.provider.fetch_events(today)
+        if self._geo is None:
+            self._geo = load_geo()
+        self.event_load = event_load(self._geo, events, str(today))
+        self.events = events
+        self._events_day, self._events_at = today, time.monotonic()
+
+    async def refresh(self, force: bool = False):
+        """Fetch whatever is stale (both sources concurrently). Failures keep the previous value."""
+        today = date.today()
+        jobs = []
+        if force or self._weather_stale():
+            jobs.append(self._refresh_weather())
+        if force or self._events_stale(today):
+            jobs.append(self._refresh_events(today))
+        for result in await asyncio.gather(*jobs, return_exceptions=True):
+            if isinstance(result, Exception):
+                self.errors += 1
+                log.warning("feature refresh failed: %r", result)
+
+    async def run(self, poll_seconds: float = 60.0):
+        """Background loop for the app's lifespan; cancel the task to stop it."""
+        while True:
+            await self.refresh()
+            await asyncio.sleep(poll_seconds)
+
+    def snapshot(self) -> dict:
+        """Non-blocking read for request handlers: whatever was fetched last (None until the first refresh)."""
+        return {
+            "weather": self.weather,
+            "events": self.events,
+            "events_date": str(self._events_day) if self._events_day else None,
+            "event_load": self.event_load.busiest() if self.event_load is not None else None,
+            "refresh_errors": self.errors,
+        }
+
+
+def store_from_env() -> FeatureStore | None:
+    """TTC_FEATURES: "off" (default), "fake" (offline stand-in) or "live" (API keys from the weather/ticketmaster env vars)."""
+    mode = os.getenv("TTC_FEATURES", "off").lower()
+    if mode == "fake":
+        return FeatureStore(FakeProvider())
+    if mode == "live":
+        return FeatureStore(HttpProvider(os.getenv("weather"), os.getenv("ticketmaster")))
+    return None
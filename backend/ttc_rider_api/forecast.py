@@ -0,0 +1,77 @@
+# Multi-day forecasts: a (station/line pair, day, hour) tensor for a selection of stations, days and hours
+# The grid is expanded server-side and read as one fancy-indexed slice of the prediction table (or scored in a
+# single batched model call when the table is off), instead of 7 x 24 /predict records per station.
+
+import numpy as np
+
+from ttc_rider_api.model import predict_batch, records_frame
+from ttc_rider_api.service_hours import open_mask
+from ttc_rider_api.prediction_table import DAYS, HOURS, PredictionTable
+from ttc_rider_api.heatmap import network_pairs
+
+# Hours are selected by name too, so "6-9" parses like "monday-friday"
+HOUR_NAMES = [str(h) for h in range(HOURS)]
+
+
+def parse_selection(spec: str, names: list[str]) -> list[int]:
+    """
+    Indices selected by a spec like "all", "monday-friday", "saturday,sunday", "6-9,16-19" or "8".
+    Ranges are inclusive and follow the order of `names`; raises ValueError on anything unknown.
+    """
+    spec = spec.strip().lower()
+    if spec in ("", "all"):
+        return list(range(len(names)))
+    index = {n: i for i, n in enumerate(names)}
+    out = []
+    for part in spec.split(","):
+        lo, _, hi = part.strip().partition("-")
+        if lo not in index or (hi and hi not in index):
+            raise ValueError(f"unknown value in {spec!r}; expected {names[0]}..{names[-1]}")
+        start, stop = index[lo], index[hi or lo]
+        if stop < start:
+            raise ValueError(f"empty range {part!r}")
+        out.extend(i for i in range(start, stop + 1) if i not in out)
+    return out
+
+
+def select_pairs(table: PredictionTable | None, stations: str) -> tuple[list[str], list[str]]:
+    """Every line of each requested station ("all", or comma-separated names, case-insensitive)."""
+    all_stations, all_lines = network_pairs(table)
+    if stations.strip().lower() in ("", "all"):
+        return list(all_stations), list(all_lines)
+    wanted = [s.strip().lower() for s in stations.split(",") if s.strip()]
+    by_name: dict[str, list[int]] = {}
+    for i, s in enumerate(all_stations):
+        by_name.setdefault(s.lower(), []).append(i)
+    unknown = [s for s in wanted if s not in by_name]
+    if unknown:
+        raise ValueError(f"unknown stations: {unknown}")
+    idx = [i for s in dict.fromkeys(wanted) for i in by_name[s]]
+    return [all_stations[i] for i in idx], [all_lines[i] for i in idx]
+
+
+def forecast(model, table: PredictionTable | None, stations: list[str], lines: list[str],
+             day_idx: list[int], hours: list[int]) -> np.ndarray:
+    """float32 array of shape (pairs, days, hours); closed hours are 0."""
+    if table is not None:
+        p = [table.pair_index[pair] for pair in zip(stations, lines)]
+        return np.ascontiguousarray(table.values[np.ix_(p, day_idx, hours)], dtype=np.float32)
+
+    # No table: expand the grid and score every open cell in one model call
+    shape = (len(stations), len(day_idx), len(hours))
+    pair_idx, d_idx, h_idx = (a.reshape(-1) for a in np.indices(shape))
+    grid_days = np.asarray(DAYS, dtype=object)[np.asarray(day_idx)[d_idx]]
+    grid_hours = np.asarray(hours)[h_idx]
+
+    values = np.zeros(pair_idx.size, dtype=np.float32)
+    open_idx = np.flatnonzero(open_mask(grid_days, grid_hours))
+    if open_idx.size:
+        frame = records_frame(
+            np.asarray(stations, dtype=object)[pair_idx[open_idx]],
+            np.asarray(lines, dtype=object)[pair_idx[open_idx]],
+            grid_days[open_idx],
+            grid_hours[open_idx],
+        )
+        values[open_idx] = predict_batch(model, frame)
+    return values.reshape(shape)
+
@@ -0,0 +1,122 @@
+# Station geography + per-day "event load" features
+#
+# stations.csv holds one coordinate per (station, line) pair (same names as the ridership data). Stations are
+# projected to local km and put in a KD-tree once, so finding the stations near a venue is a tree query rather
+# than distance math against every station on every request.
+#
+# event_load() turns a day's events into a dense (pairs, 24 hours) table: each event adds its venue capacity,
+# decayed with distance to the station and spread over the hours riders arrive before the start and leave
+# after it. Lookups are one dict hit + array index per record, same as the prediction table.
+
+from pathlib import Path
+import numpy as np
+import pandas as pd
+
+from ttc_rider_api.prediction_table import HOURS
+
+GEO_PATH = Path("ttc_rider_api/stations.csv")
+
+EARTH_RADIUS_KM = 6371.0
+RADIUS_KM = 2.0            # venues farther than this from a station don't affect it
+DISTANCE_SCALE_KM = 0.75   # capacity weight decays as exp(-distance / scale)
+DEFAULT_START_HOUR = 19.0  # when an event has no start time
+
+# Riders arrive in the ~2 hours before the start and leave ~3 hours after it
+ARRIVAL_OFFSET, DEPARTURE_OFFSET, SPREAD_HOURS = -1.0, 3.0, 0.75
+
+
+def _project(lat, lon, lat0: float) -> np.ndarray:
+    """Equirectangular projection to km around lat0 (plenty accurate across one city)."""
+    lat, lon = np.radians(lat), np.radians(lon)
+    return np.column_stack([EARTH_RADIUS_KM * lon * np.cos(np.radians(lat0)), EARTH_RADIUS_KM * lat])
+
+
+class StationGeo:
+    """Station/line coordinates plus a KD-tree over them."""
+
+    def __init__(self, stations: list[str], lines: list[str], lat: np.ndarray, lon: np.ndarray):
+        self.stations = list(stations)
+        self.lines = list(lines)
+        self.lat = np.asarray(lat, dtype=float)
+        self.lon = np.asarray(lon, dtype=float)
+        self.lat0 = float(self.lat.mean()) if len(self.lat) else 0.0
+        self.xy = _project(self.lat, self.lon, self.lat0)
+        from scipy.spatial import cKDTree  # scipy is only needed once the feature store builds an event table
+        self.tree = cKDTree(self.xy)
+        self.pair_index = {pair: i for i, pair in enumerate(zip(self.stations, self.lines))}
+
+    def near(self, lat: float, lon: float, radius_km: float = RADIUS_KM) -> tuple[np.ndarray, np.ndarray]:
+        """Indices of the pairs within radius_km of a point, and their distances in km."""
+        point = _project([lat], [lon], self.lat0)[0]
+        idx = np.asarray(self.tree.query_ball_point(point, radius_km), dtype=np.int64)
+        return idx, np.linalg.norm(self.xy[idx] - point, axis=1)
+
+
+def load_geo(path: Path = GEO_PATH) -> StationGeo:
+    df = pd.read_csv(path)
+    return StationGeo(df["station"].str.strip().tolist(), df["line"].str.strip().tolist(),
+                      df["latitude"].to_numpy(), df["longitude"].to_numpy())
+
+
+def start_hour(event: dict) -> float:
+    """Local start time as fractional hours ("19:30:00" -> 19.5)."""
+    try:
+        h, m = str(event.get("time")).split(":")[:2]
+        return int(h) + int(m) / 60
+    except (TypeError, ValueError):
+        return DEFAULT_START_HOUR
+
+
+def time_profiles(starts: np.ndarray) -> np.ndarray:
+    """(events, 24) weights in [0, 1]: an arrival bump before each start and a departure bump after it."""
+    hours = np.arange(HOURS, dtype=float)
+    hours[hours < 4] += 24  # 00:00–03:00 belong to the previous service day (trains run until ~01:30)
+    offset = hours[None, :] - np.asarray(starts, dtype=float)[:, None]
+    bump = lambda center: np.exp(-0.5 * ((offset - center) / SPREAD_HOURS) ** 2)
+    return np.maximum(bump(ARRIVAL_OFFSET), bump(DEPARTURE_OFFSET))
+
+
+class EventLoadTable:
+    """Dense float32 (pairs, 24 hours) event load for one day, addressed like the prediction table."""
+
+    def __init__(self, geo: StationGeo, day: str | None, values: np.ndarray):
+        self.geo = geo
+        self.day = day
+        self.values = values
+
+    def lookup(self, stations, lines, hours) -> np.ndarray:
+        """Event load per record; unknown pairs or hours get 0."""
+        p = np.fromiter((self.geo.pair_index.get(pair, -1) for pair in zip(stations, lines)), dtype=np.int64, count=len(stations))
+        h = np.asarray(hours, dtype=np.int64)
+        found = (p >= 0) & (h >= 0) & (h < HOURS)
+        out = np.zeros(len(p), dtype=np.float32)
+        out[found] = self.values[p[found], h[found]]
+        return out
+
+    def busiest(self, n: int = 10) -> list[dict]:
+        """Pairs with the highest peak load, for display."""
+        peak = self.values.max(axis=1)
+        order = [i for i in np.argsort(-peak)[:n] if peak[i] > 0]
+        return [{"station": self.geo.stations[i], "line": self.geo.lines[i], "peak_load": round(float(peak[i]), 1),
+                 "peak_hour": int(self.values[i].argmax())} for i in order]
+
+
+def event_load(geo: StationGeo, events: list[dict], day: str | None = None, radius_km: float = RADIUS_KM) -> EventLoadTable:
+    """Capacity x distance decay x start-time profile, summed over every event near each station."""
+    values = np.zeros((len(geo.stations), HOURS), dtype=np.float32)
+    events = [e for e in events or [] if e.get("latitude") is not None and e.get("longitude") is not None and e.get("capacity")]
+    if not events:
+        return EventLoadTable(geo, day, values)
+
+    venues = _project([e["latitude"] for e in events], [e["longitude"] for e in events], geo.lat0)
+    capacity = np.array([e["capacity"] for e in events], dtype=float)
+    profiles = time_profiles(np.array([start_hour(e) for e in events]))
+
+    # One batched tree query, then flat (event, station) pairs for every hit
+    hits = geo.tree.query_ball_point(venues, radius_km)
+    ev = np.repeat(np.arange(len(events)), [len(h) for h in hits])
+    st = np.concatenate([np.asarray(h, dtype=np.int64) for h in hits])
+    dist = np.linalg.norm(geo.xy[st] - venues[ev], axis=1)
+    weight = capacity[ev] * np.exp(-dist / DISTANCE_SCALE_KM)
+    np.add.at(values, st, (weight[:, None] * profiles[ev]).astype(np.float32))
+    return EventLoadTable(geo, day, values)
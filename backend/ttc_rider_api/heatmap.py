@@ -0,0 +1,64 @@
+# Whole-network heatmap for one day/hour: every known station/line pair in a single columnar payload
+# Read as one slice of the prediction table (or one batched model call when the table is off), then memoized
+# as encoded JSON per (model_version, day, hour, minute) so repeat requests skip both inference and serialization.
+# Sub-hour times interpolate between two hourly slices (see timeline.py).
+
+import numpy as np
+import pandas as pd
+
+from ttc_rider_api.encoding import dumps
+from ttc_rider_api.memo import MEMO
+from ttc_rider_api.model import predict_batch, records_frame
+from ttc_rider_api.service_hours import is_open
+from ttc_rider_api.prediction_table import DATA_PATH, DAYS, PredictionTable, station_line_pairs
+from ttc_rider_api.timeline import blend, next_hours
+
+_pairs: dict[str, tuple[list[str], list[str]]] = {}
+
+
+def network_pairs(table: PredictionTable | None) -> tuple[list[str], list[str]]:
+    if table is not None:
+        return table.stations, table.lines
+    if "csv" not in _pairs:
+        _pairs["csv"] = station_line_pairs(pd.read_csv(DATA_PATH))
+    return _pairs["csv"]
+
+
+def network_riders(model, table: PredictionTable | None, day: str, hour: int, minute: int = 0) -> tuple[list[str], list[str], np.ndarray]:
+    """Predicted riders for every station/line pair at (day, hour, minute), in one vectorized pass."""
+    if minute:
+        stations, lines, at_hour = network_riders(model, table, day, hour)
+        _, _, at_next_hour = network_riders(model, table, day, int(next_hours(hour)))
+        if not is_open(day, hour, minute):
+            return stations, lines, np.zeros_like(at_hour)
+        return stations, lines, blend(at_hour, at_next_hour, minute)
+
+    stations, lines = network_pairs(table)
+    if table is not None:
+        # Copy the column out of the (possibly memory-mapped) table so the cached result owns its data
+        return stations, lines, np.array(table.values[:, DAYS.index(day), hour])
+
+    n = len(stations)
+    riders = np.zeros(n, dtype=np.float32)
+    if n and is_open(day, hour):
+        riders[:] = predict_batch(model, records_frame(stations, lines, [day] * n, np.full(n, hour)))
+    return stations, lines, riders
+
+
+def heatmap_json(model, meta: dict, table: PredictionTable | None, day: str, hour: int, minute: int = 0) -> bytes:
+    """Encoded JSON body, memoized per model version: at most 7 x 24 x buckets-per-hour entries."""
+    model_version = meta.get("model_version", "unknown")
+
+    def build() -> bytes:
+        stations, lines, riders = network_riders(model, table, day, hour, minute)
+        return dumps({
+            "model_version": model_version,
+            "day": day,
+            "hour": hour,
+            "minute": minute,
+            "stations": stations,
+            "lines": lines,
+            "riders": np.round(riders, 2),
+        })
+
+    return MEMO.get(model_version, ("heatmap", day, hour, minute), build)
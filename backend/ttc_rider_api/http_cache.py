@@ -0,0 +1,50 @@
+# HTTP caching for the deterministic endpoints
+# For one model version, every response is a pure function of the normalized request, so a strong ETag is just a
+# hash of (model_version, endpoint, normalized params): it can be computed (and a 304 returned) before any work.
+#
+# Cache-Control follows the model version: a URL pinned with ?v=<current model_version> can never change, so it
+# is cached as immutable; unpinned URLs change when the model is swapped, so they get a short max-age
+# (TTC_HTTP_MAX_AGE, default 60s) and are revalidated with the ETag after that.
+
+import hashlib, os
+
+from ttc_rider_api.encoding import dumps
+
+MAX_AGE = int(os.getenv("TTC_HTTP_MAX_AGE", "60"))
+IMMUTABLE_MAX_AGE = 31536000  # one year
+
+# Compressed representations get their own strong ETag: '"<digest>-gzip"' (see compression.py)
+ENCODING_SUFFIXES = ("-gzip", "-br")
+
+
+def make_etag(model_version: str, *parts) -> str:
+    """Strong ETag for a response; parts may contain lists and NumPy arrays."""
+    return '"' + hashlib.sha256(dumps([model_version, *parts])).hexdigest()[:32] + '"'
+
+
+def variant_etag(etag: str, encoding: str) -> str:
+    return f'{etag[:-1]}-{encoding}"' if etag.endswith('"') else etag
+
+
+def _base_tag(tag: str) -> str:
+    tag = tag.strip().removeprefix("W/")
+    for suffix in ENCODING_SUFFIXES:
+        if tag.endswith(suffix + '"'):
+            return tag[:-len(suffix) - 1] + '"'
+    return tag
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """If-None-Match check that also accepts the compressed variants of the same ETag."""
+    if if_none_match is None:
+        return False
+    tags = [_base_tag(t) for t in if_none_match.split(",")]
+    return "*" in tags or etag in tags
+
+
+def cache_headers(model_version: str, etag: str, pinned_version: str | None = None) -> dict[str, str]:
+    if pinned_version is not None and pinned_version == model_version:
+        cache_control = f"public, max-age={IMMUTABLE_MAX_AGE}, immutable"
+    else:
+        cache_control = f"public, max-age={MAX_AGE}, must-revalidate"
+    return {"ETag": etag, "Cache-Control": cache_control, "X-Model-Version": model_version}
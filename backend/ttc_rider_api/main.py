@@ -1,12 +1,92 @@
-from typing import List, Optional, Tuple
+import time
+_IMPORT_STARTED = time.perf_counter()  # measured import time is reported by /ready
+
+from typing import List, Literal, Optional, Tuple
+from contextlib import asynccontextmanager, suppress
 from datetime import datetime
-import pandas as pd
-from fastapi import FastAPI, HTTPException
+import asyncio, logging, os, secrets, threading
+import numpy as np
+from fastapi import FastAPI, HTTPException, Header, Query, Response
 from pydantic import BaseModel, Field
-from ttc_rider_api.model import load_model, predict_batch
+from ttc_rider_api.model import records_frame
+from ttc_rider_api.service_hours import open_mask
+from ttc_rider_api.prediction_table import DAYS
+from ttc_rider_api import serving
+from ttc_rider_api.heatmap import heatmap_json
+from ttc_rider_api.options import get_options as cached_options, not_modified, http_date
+from ttc_rider_api import profiling
+from ttc_rider_api.encoding import TENSOR_MEDIA_TYPE, dumps, pack_tensor
+from ttc_rider_api.forecast import HOUR_NAMES, forecast as forecast_tensor, parse_selection, select_pairs
+from ttc_rider_api.prediction_cache import cache_from_env, make_key
+from ttc_rider_api.batcher import MicroBatcher
+from ttc_rider_api.enrichment import store_from_env
+from ttc_rider_api.timeline import blend, next_hours, snap_minutes
+from ttc_rider_api.http_cache import cache_headers, etag_matches, make_etag
+from ttc_rider_api.compression import CompressionMiddleware
+from ttc_rider_api.snapshot import SNAPSHOT_FORMAT, SNAPSHOT_MEDIA_TYPE, network_snapshot
 from fastapi.middleware.cors import CORSMiddleware
 
-app = FastAPI(title="TTC Ridership API", version="0.2.0")
+log = logging.getLogger("ttc_rider_api")
+
+# Cold start: importing this module stays cheap (no model load, sklearn/xgboost deferred). The model, meta and
+# prediction table are loaded + warmed together in the lifespan handler (see serving.py), in the background so
+# /health answers right away; /ready reports 503 until the first model is warm. A failed load is retried with
+# backoff (up to STARTUP_RETRY_MAX seconds apart) until it succeeds or a reload/watcher swap gets there first.
+STARTUP_RETRY_MAX = float(os.getenv("TTC_STARTUP_RETRY_MAX", "60"))
+
+async def warm_start():
+    delay = 1.0
+    while serving.current is None:
+        try:
+            state, _ = await asyncio.to_thread(serving.reload)
+        except Exception as e:
+            serving.startup_error = repr(e)
+            log.exception("startup failed, retrying in %.0fs", delay)
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, STARTUP_RETRY_MAX)
+            continue
+        # One pass through the batcher too, so its executor thread exists before the first real request
+        await BATCHER.predict(state.model, records_frame(["Union"], ["Line 1"], ["monday"], [8]))
+        log.info("ready: import %.2fs, load %.2fs, warm-up %.2fs", IMPORT_SECONDS,
+                 state.timings["load_seconds"], state.timings["warm_up_seconds"])
+
+# Optional background watcher: TTC_RELOAD_INTERVAL=<seconds> polls artifacts/ and swaps in a new model when it changes
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    startup = asyncio.create_task(warm_start())
+    interval = float(os.getenv("TTC_RELOAD_INTERVAL", "0"))
+    stop = threading.Event()
+    if interval > 0:
+        threading.Thread(target=serving.watch, args=(interval, stop), daemon=True, name="model-watcher").start()
+    refresher = asyncio.create_task(FEATURES.run()) if FEATURES is not None else None
+    yield
+    if not startup.done():
+        startup.cancel()  # still retrying a failed load
+    with suppress(asyncio.CancelledError):
+        await startup
+    stop.set()
+    await BATCHER.shutdown()
+    if refresher is not None:
+        # Let the refresh loop unwind before its HTTP client is closed under it
+        refresher.cancel()
+        with suppress(asyncio.CancelledError):
+            await refresher
+        await FEATURES.provider.aclose()
+
+app = FastAPI(title="TTC Ridership API", version="0.2.0", lifespan=lifespan)
+
+# Prediction cache in front of the model (see prediction_cache.py for TTC_CACHE_* settings); None when disabled
+CACHE = cache_from_env()
+
+# Rows that need the model are merged across concurrent requests: TTC_BATCH_WAIT_MS window (0 = no batching),
+# TTC_BATCH_MAX_ROWS flushes early once that many rows are queued
+BATCHER = MicroBatcher(
+    max_wait=float(os.getenv("TTC_BATCH_WAIT_MS", "2")) / 1000,
+    max_rows=int(os.getenv("TTC_BATCH_MAX_ROWS", "4096")),
+)
+
+# Weather + venue events, refreshed in the background (TTC_FEATURES=off|fake|live, see enrichment.py); None when off
+FEATURES = store_from_env()
 
 app.add_middleware(
     CORSMiddleware,
@@ -14,19 +94,23 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],  # allows POST, GET, OPTIONS, etc.
     allow_headers=["*"],  # allows Content-Type, Authorization, etc.
+    expose_headers=["ETag", "X-Model-Version"],
 )
-MODEL, META = load_model()
-
-# TTC Service Hours
-def is_service_hour(hour: int, day: str) -> bool:
-    """Return True if TTC is open for the given hour/day."""
-    day = day.lower()
-    if day in ["saturday", "sunday"]:
-        # Weekends: open 8 AM – 1 AM next day
-        return (8 <= hour <= 23) or (hour in [0, 1])
-    else:
-        # Weekdays: open 6 AM – 1 AM next day
-        return (6 <= hour <= 23) or (hour in [0, 1])
+
+# gzip/brotli for JSON and tensor bodies over TTC_COMPRESS_MIN_BYTES (see compression.py)
+app.add_middleware(CompressionMiddleware)
+
+# Inference profiling: "off" (default), "log" (one log line per batch) or "histogram" (served at /metrics)
+profiling.set_sink(profiling.sink_from_env(os.getenv("TTC_PROFILING")))
+
+IMPORT_SECONDS = time.perf_counter() - _IMPORT_STARTED
+
+# Current serving bundle, or 503 while the first model is still loading
+def serving_state() -> serving.ServingState:
+    state = serving.current
+    if state is None:
+        raise HTTPException(status_code=503, detail="model is still loading", headers={"Retry-After": "1"})
+    return state
 
 # Request/response models
 class PredictRecord(BaseModel):
@@ -34,6 +118,7 @@ class PredictRecord(BaseModel):
     line: str
     day: str
     hour: int
+    minute: int = Field(0, ge=0, le=59)  # snapped down to TTC_BUCKET_MINUTES
 
 
 class PredictRequest(BaseModel):
@@ -44,6 +129,7 @@ class PredictResponseItem(BaseModel):
     station: str
     line: str
     hour: int
+    minute: int = 0
     day: str
     riders: float
 
@@ -52,62 +138,277 @@ class PredictResponse(BaseModel):
     model_version: str
     predictions: List[PredictResponseItem]
 
+# Scores a batch of records: returns the normalized inputs plus a riders array in the original order
+async def score_records(state: serving.ServingState, recs: List[PredictRecord], timer):
+
+    stations = [r.station.strip() for r in recs]
+    lines = [r.line.strip() for r in recs]
+    days = [r.day.lower().strip() for r in recs]
+    hours = np.array([int(r.hour) for r in recs], dtype=np.int64)
+    minutes = snap_minutes([r.minute for r in recs])
+    timer.lap("frame")
+
+    # Sub-hour rows also need the next hour's value: score both as extra hourly rows, then interpolate
+    sub = np.flatnonzero(minutes > 0)
+    if sub.size == 0:
+        riders = await score_hourly(state, stations, lines, days, hours, timer)
+        return stations, lines, days, hours, minutes, riders
+
+    riders = await score_hourly(
+        state,
+        stations + [stations[i] for i in sub],
+        lines + [lines[i] for i in sub],
+        days + [days[i] for i in sub],
+        np.concatenate([hours, next_hours(hours[sub])]),
+        timer,
+    )
+    riders, at_next_hour = riders[:len(recs)], riders[len(recs):]
+    riders[sub] = blend(riders[sub], at_next_hour, minutes[sub])
+    riders[~open_mask(days, hours, minutes)] = 0  # e.g. 01:45 is closed even though 01:00 is open
+    return stations, lines, days, hours, minutes, riders
+
+# A shared (network) cache backend is called from a worker thread so it never blocks the event loop
+async def cache_call(method, *args):
+    if CACHE.blocking:
+        return await asyncio.to_thread(method, *args)
+    return method(*args)
+
+# Hourly riders for parallel station/line/day/hour arrays: prediction table, then cache, then one batched model call
+async def score_hourly(state: serving.ServingState, stations: list, lines: list, days: list, hours: np.ndarray, timer):
+
+    # Closed hours stay at 0; every open-hour row goes through the model in a single call
+    riders = np.zeros(len(stations), dtype=float)
+    open_rows = open_mask(days, hours)
+
+    # Known station/line/day combos are read straight from the table; only the rest fall through to the model
+    if state.table is not None:
+        table_riders, found = state.table.lookup(stations, lines, days, hours)
+        riders[found] = table_riders[found]
+        open_rows &= ~found
+        timer.lap("lookup")
+
+    open_idx = np.flatnonzero(open_rows)
+
+    # Rows already scored for this model version come from the cache; only the misses reach the model
+    if CACHE is not None and open_idx.size:
+        keys = [make_key(state.model_version, stations[i], lines[i], days[i], hours[i]) for i in open_idx]
+        cached = await cache_call(CACHE.get_many, keys)
+        hit = np.array([v is not None for v in cached])
+        riders[open_idx[hit]] = [v for v in cached if v is not None]
+        open_idx, keys = open_idx[~hit], [k for k, h in zip(keys, hit) if not h]
+        timer.lap("cache")
+
+    if open_idx.size:
+        frame = records_frame(
+            [stations[i] for i in open_idx],
+            [lines[i] for i in open_idx],
+            [days[i] for i in open_idx],
+            hours[open_idx],
+        )
+        timer.lap("frame")
+        riders[open_idx] = await BATCHER.predict(state.model, frame, timer)
+        if CACHE is not None:
+            await cache_call(CACHE.set_many, list(zip(keys, riders[open_idx].tolist())))
+
+    return riders
+
 # POST /predict
+# format=columnar skips the per-record Pydantic models and returns parallel arrays encoded straight from NumPy
 @app.post("/predict", response_model=PredictResponse)
-def predict(request: PredictRequest):
+async def predict(response: Response, request: PredictRequest, format: Literal["records", "columnar"] = "records"):
     recs = request.records if isinstance(request.records, list) else [request.records]
-    items: List[PredictResponseItem] = []
-
-    valid_days = ["monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday"]
-
-    for r in recs:
-        day = r.day.lower().strip()
-        hour = int(r.hour)
-        is_weekend = 1 if day in ["saturday", "sunday"] else 0
-
-        if not is_service_hour(hour, day):
-            riders = 0.0
-        else:
-            payload = {
-                "station": r.station.strip(),
-                "line": r.line.strip(),
-                "day": day,
-                "hour": hour,
-                "minute": 0,
-                "is_weekend": is_weekend
-            }
-            yhat = predict_batch(MODEL, [payload])[0]
-            riders = float(yhat)
-
-        items.append(PredictResponseItem(
-            station=r.station.strip(),
-            line=r.line.strip(),
-            hour=hour,
-            day=day,
-            riders=riders
-        ))
-
-    return PredictResponse(
-        model_version=META.get("model_version", "unknown"),
+    state = serving_state()  # one read, so the whole request uses a single model version
+    timer = profiling.timer(len(recs))
+    stations, lines, days, hours, minutes, riders = await score_records(state, recs, timer)
+    # Strong ETag over the normalized inputs (POST responses aren't revalidated, but clients can dedupe on it)
+    headers = cache_headers(state.model_version, make_etag(state.model_version, "predict", format, stations, lines, days, hours, minutes))
+
+    if format == "columnar":
+        body = dumps({
+            "model_version": state.model_version,
+            "stations": stations,
+            "lines": lines,
+            "days": days,
+            "hours": hours,
+            "minutes": minutes,
+            "riders": riders,
+        })
+        timer.lap("serialize")
+        timer.done()
+        return Response(content=body, media_type="application/json", headers=headers)
+
+    items = [
+        PredictResponseItem(station=s, line=l, hour=h, minute=m, day=d, riders=float(y))
+        for s, l, d, h, m, y in zip(stations, lines, days, hours.tolist(), minutes.tolist(), riders)
+    ]
+
+    result = PredictResponse(
+        model_version=state.model_version,
         predictions=items
     )
+    response.headers.update(headers)
+    timer.lap("serialize")
+    timer.done()
+    return result
+
+# GET /heatmap — predicted riders for every station/line pair at one day/hour(/minute), as parallel arrays
+# Cacheable: ETag per (model_version, day, hour, minute); pass v=<model_version> for an immutable URL
+@app.get("/heatmap")
+def heatmap(
+    day: str,
+    hour: int = Query(..., ge=0, le=23),
+    minute: int = Query(0, ge=0, le=59),
+    v: Optional[str] = None,
+    if_none_match: Optional[str] = Header(None),
+):
+    day = day.lower().strip()
+    if day not in DAYS:
+        raise HTTPException(status_code=422, detail=f"day must be one of {DAYS}")
+    minute = int(snap_minutes(minute))
+    state = serving_state()
+    headers = cache_headers(state.model_version, make_etag(state.model_version, "heatmap", day, hour, minute), v)
+    if etag_matches(if_none_match, headers["ETag"]):
+        return Response(status_code=304, headers=headers)
+    return Response(content=heatmap_json(state.model, state.meta, state.table, day, hour, minute),
+                    media_type="application/json", headers=headers)
+
+# GET /forecast — riders for a set of stations across a day/hour range, as a (station/line pair, day, hour) tensor
+# e.g. /forecast?stations=Union,Bloor-Yonge&days=monday-friday&hours=6-23&format=binary
+# format=binary returns a packed float32 buffer with a JSON shape header (see encoding.pack_tensor)
+@app.get("/forecast")
+def forecast(
+    stations: str = "all",
+    days: str = "all",
+    hours: str = "all",
+    format: Literal["json", "binary"] = "json",
+    v: Optional[str] = None,
+    if_none_match: Optional[str] = Header(None),
+):
+    state = serving_state()
+    try:
+        pair_stations, pair_lines = select_pairs(state.table, stations)
+        day_idx = parse_selection(days, DAYS)
+        hour_idx = parse_selection(hours, HOUR_NAMES)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+    # Validated against the normalized selection, so "Union,union" and "union" share one ETag
+    etag = make_etag(state.model_version, "forecast", format, pair_stations, pair_lines, day_idx, hour_idx)
+    headers = cache_headers(state.model_version, etag, v)
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers=headers)
+
+    values = forecast_tensor(state.model, state.table, pair_stations, pair_lines, day_idx, hour_idx)
+    header = {
+        "model_version": state.model_version,
+        "stations": pair_stations,
+        "lines": pair_lines,
+        "days": [DAYS[d] for d in day_idx],
+        "hours": hour_idx,
+    }
+    if format == "binary":
+        return Response(content=pack_tensor(values, header), media_type=TENSOR_MEDIA_TYPE, headers=headers)
+    return Response(content=dumps({**header, "shape": list(values.shape), "riders": np.round(values, 2)}),
+                    media_type="application/json", headers=headers)
+
+# GET /snapshot — the whole network (every pair x day x hour) quantized + delta-encoded, for the map to load once
+# mode=counts: uint16 riders; mode=bins: uint8 crowding levels (see snapshot.py). Fetched as /snapshot?v=<model_version>
+# it is cached as immutable, and timeline scrubbing reads it locally instead of calling /heatmap per step.
+@app.get("/snapshot")
+def snapshot(
+    mode: Literal["counts", "bins"] = "counts",
+    v: Optional[str] = None,
+    if_none_match: Optional[str] = Header(None),
+):
+    state = serving_state()
+    headers = cache_headers(state.model_version, make_etag(state.model_version, "snapshot", SNAPSHOT_FORMAT, mode), v)
+    if etag_matches(if_none_match, headers["ETag"]):
+        return Response(status_code=304, headers=headers)
+    return Response(content=network_snapshot(state.model, state.meta, state.table, mode),
+                    media_type=SNAPSHOT_MEDIA_TYPE, headers=headers)
 
-# GET /options — metadata for dropdowns or UIs
+# GET /options — metadata for dropdowns or UIs (served from memory, revalidated with ETag / Last-Modified)
 @app.get("/options")
-def get_options():
-    df = pd.read_csv("ttc_rider_api/Ridership-Data.csv")
-    return {
-        "hours": list(range(24)),
-        "days": sorted(df["Day"].dropna().astype(str).str.lower().str.strip().unique().tolist()),
-        "stations": sorted(df["Station"].dropna().astype(str).str.strip().unique().tolist()),
-        "lines": sorted(df["Line"].dropna().astype(str).str.strip().unique().tolist()),
+def get_options(
+    response: Response,
+    v: Optional[str] = None,
+    if_none_match: Optional[str] = Header(None),
+    if_modified_since: Optional[str] = Header(None),
+):
+    state = serving_state()
+    cached = cached_options(state.meta)
+    headers = {
+        **cache_headers(state.model_version, cached["etag"], v),
+        "Last-Modified": http_date(cached["last_modified"]),
     }
+    if not_modified(cached, if_none_match, if_modified_since):
+        return Response(status_code=304, headers=headers)
+
+    response.headers.update(headers)
+    return cached["body"]
+
+# GET /metrics — prediction cache + batching counters, inference stage histograms (only populated when TTC_PROFILING=histogram)
+@app.get("/metrics")
+def metrics():
+    sink = profiling.get_sink()
+    serving_stats = {"cache": CACHE.stats() if CACHE is not None else None, "batching": BATCHER.stats()}
+    if not isinstance(sink, profiling.HistogramSink):
+        return {"profiling": "off" if sink is None else type(sink).__name__, **serving_stats}
+    return {"profiling": "histogram", **sink.snapshot(), **serving_stats}
 
-# GET /health
+# GET /features — latest cached weather + events (never triggers an external call)
+@app.get("/features")
+def features():
+    if FEATURES is None:
+        raise HTTPException(status_code=404, detail="feature enrichment is disabled (set TTC_FEATURES)")
+    return FEATURES.snapshot()
+
+# GET /health — liveness: the process is up (answers while the model is still loading)
 @app.get("/health")
 def healthz():
-    """Health check and model info."""
+    """Health check and model info (503 once loading has failed and no model is serving, so liveness restarts)."""
+    state = serving.current
+    if state is None and serving.startup_error:
+        return Response(content=dumps({"status": "failed", "error": serving.startup_error}), status_code=503,
+                        media_type="application/json")
     return {
         "status": "ok",
-        "model_version": META.get("model_version", "unknown")
+        "model_version": state.model_version if state is not None else None
+    }
+
+# GET /ready — readiness: 200 once the model is loaded and warmed, 503 before that (or if startup failed)
+@app.get("/ready")
+def ready():
+    state = serving.current
+    if not serving.ready.is_set() or state is None:
+        status = "failed" if serving.startup_error else "starting"
+        return Response(content=dumps({"status": status, "error": serving.startup_error}), status_code=503,
+                        media_type="application/json")
+    return {
+        "status": "ready",
+        "model_version": state.model_version,
+        "import_seconds": round(IMPORT_SECONDS, 3),
+        **{k: round(v, 3) for k, v in state.timings.items()},
+    }
+
+# POST /reload — load the artifacts on disk off the request path, warm them up, then atomically swap them in
+# Disabled unless TTC_ADMIN_TOKEN is set; callers must then send it in the X-Admin-Token header.
+@app.post("/reload")
+def reload_model(x_admin_token: Optional[str] = Header(None)):
+    token = os.getenv("TTC_ADMIN_TOKEN")
+    if not token:
+        raise HTTPException(status_code=404, detail="reload is disabled (set TTC_ADMIN_TOKEN to enable it)")
+    if x_admin_token is None or not secrets.compare_digest(x_admin_token, token):
+        raise HTTPException(status_code=403, detail="invalid admin token")
+
+    previous = serving.current.model_version if serving.current is not None else None
+    try:
+        state, swapped = serving.reload()
+    except Exception as e:
+        # The old model keeps serving
+        raise HTTPException(status_code=500, detail=f"reload failed: {e}")
+    return {
+        "status": "reloaded" if swapped else "unchanged",
+        "previous_model_version": previous,
+        "model_version": state.model_version,
     }
@@ -0,0 +1,32 @@
+# Per-model-version memo for the deterministic responses (/heatmap bodies, snapshots, /options)
+# Each entry is a pure function of (model_version, key), so entries only live as long as their model version.
+# The store is a single (version, entries) pair: readers take that reference once and never see a dict being cleared,
+# and a new version swaps in a fresh pair under the lock instead of emptying the one other threads are reading.
+
+import threading
+
+
+class VersionMemo:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._store: tuple[str | None, dict] = (None, {})
+
+    def get(self, model_version: str, key, build):
+        """Value for key under model_version, calling build() on a miss (concurrent misses may both build)."""
+        version, entries = self._store
+        if version == model_version and key in entries:
+            return entries[key]
+        value = build()
+        with self._lock:
+            version, entries = self._store
+            if version != model_version:
+                entries = {}
+                self._store = (model_version, entries)
+            return entries.setdefault(key, value)
+
+    def __len__(self) -> int:
+        return len(self._store[1])
+
+
+# Shared by heatmap.py, snapshot.py and options.py; keys start with the endpoint name
+MEMO = VersionMemo()
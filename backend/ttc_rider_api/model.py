@@ -2,8 +2,11 @@
 
 from pathlib import Path
 import joblib, json # loads model
+import numpy as np
 import pandas as pd
 
+from ttc_rider_api.profiling import NULL_TIMER
+
 ARTIFACTS = Path("artifacts")
 MODEL_PATH = ARTIFACTS / "model.joblib"
 META_PATH  = ARTIFACTS / "meta.json"
@@ -11,7 +14,8 @@ META_PATH  = ARTIFACTS / "meta.json"
 
 
 def load_model():
-    model = joblib.load(MODEL_PATH) # loads model 
+    # mmap_mode="r" maps any NumPy arrays in the dump read-only instead of copying them into each worker
+    model = joblib.load(MODEL_PATH, mmap_mode="r") # loads model 
     meta = {"model_version": "unknown"} # incase the labelling of metadata does not exist 
 
     # if model exists, read the json metadata
@@ -19,14 +23,32 @@ def load_model():
         meta = json.loads(META_PATH.read_text())
     return model, meta
 
-def predict_batch(model, records: list[dict]) -> list[float]:
-    df = pd.DataFrame(records)
-
-    print("\n[DEBUG] DataFrame going into model:")
-    print(df)
-    print(df.dtypes)
-    print("----------------------------\n")
-
-
-    preds = model.predict(df)
+# Builds the model input frame for a whole batch at once (columns match what train.py fits on)
+def records_frame(stations, lines, days, hours) -> pd.DataFrame:
+    days = np.asarray(days, dtype=object)
+    return pd.DataFrame({
+        "station": stations,
+        "line": lines,
+        "day": days,
+        "hour": np.asarray(hours, dtype=np.int64),
+        "minute": 0,
+        "is_weekend": np.isin(days, ["saturday", "sunday"]).astype(int),
+    })
+
+def predict_batch(model, records: list[dict] | pd.DataFrame, timer=NULL_TIMER) -> list[float]:
+    df = records if isinstance(records, pd.DataFrame) else pd.DataFrame(records)
+    timer.lap("frame")
+
+    # Same result as model.predict(df), but run step by step so preprocessing and XGBoost are timed separately
+    if hasattr(model, "named_steps"):  # sklearn Pipeline (duck-typed so importing this module doesn't pull in sklearn)
+        X = model[:-1].transform(df)
+        timer.lap("preprocess")
+        preds = model[-1].predict(X)
+    elif hasattr(model, "encode"):  # booster.NativeModel
+        X = model.encode(df)
+        timer.lap("preprocess")
+        preds = model.predict_encoded(X)
+    else:
+        preds = model.predict(df)
+    timer.lap("predict")
     return preds.tolist()
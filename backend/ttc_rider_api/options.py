@@ -0,0 +1,71 @@
+# Dropdown metadata for /options (stations, lines, days, hours), built once per model version instead of per request
+# train.py saves options.json next to meta.json; if it is missing or from another model version we rebuild from the CSV.
+
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+import hashlib, json
+import pandas as pd
+
+from ttc_rider_api.model import ARTIFACTS, META_PATH, MODEL_PATH
+from ttc_rider_api.http_cache import etag_matches
+from ttc_rider_api.memo import MEMO
+from ttc_rider_api.prediction_table import DATA_PATH
+
+OPTIONS_PATH = ARTIFACTS / "options.json"
+
+
+def build_options(df: pd.DataFrame) -> dict:
+    """Vocabularies the frontend needs, from a frame with station/line/day columns (any case)."""
+    cols = {c.lower(): c for c in df.columns}
+    return {
+        "hours": list(range(24)),
+        "days": sorted(df[cols["day"]].dropna().astype(str).str.lower().str.strip().unique().tolist()),
+        "stations": sorted(df[cols["station"]].dropna().astype(str).str.strip().unique().tolist()),
+        "lines": sorted(df[cols["line"]].dropna().astype(str).str.strip().unique().tolist()),
+    }
+
+
+def save_options(options: dict, model_version: str):
+    OPTIONS_PATH.write_text(json.dumps({"model_version": model_version, **options}, indent=2))
+
+
+def _load_options(model_version: str) -> dict:
+    if OPTIONS_PATH.exists():
+        saved = json.loads(OPTIONS_PATH.read_text())
+        if saved.pop("model_version", None) == model_version:
+            return saved
+    return build_options(pd.read_csv(DATA_PATH))
+
+
+def _artifact_mtime() -> datetime:
+    path = META_PATH if META_PATH.exists() else MODEL_PATH
+    # HTTP dates have 1s resolution, so drop microseconds to keep If-Modified-Since comparisons exact
+    return datetime.fromtimestamp(int(path.stat().st_mtime), tz=timezone.utc)
+
+
+def get_options(meta: dict) -> dict:
+    """Return {"body", "etag", "last_modified"} for the current model version, rebuilding only when it changes."""
+    model_version = meta.get("model_version", "unknown")
+
+    def build() -> dict:
+        body = _load_options(model_version)
+        digest = hashlib.sha256(json.dumps([model_version, body], sort_keys=True).encode()).hexdigest()[:32]
+        return {"body": body, "etag": f'"{digest}"', "last_modified": _artifact_mtime()}
+
+    return MEMO.get(model_version, ("options",), build)
+
+
+def not_modified(cached: dict, if_none_match: str | None, if_modified_since: str | None) -> bool:
+    """True if the client's validators still match (If-None-Match wins over If-Modified-Since, per RFC 9110)."""
+    if if_none_match is not None:
+        return etag_matches(if_none_match, cached["etag"])
+    if if_modified_since is not None:
+        try:
+            return cached["last_modified"] <= parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+    return False
+
+
+def http_date(dt: datetime) -> str:
+    return format_datetime(dt, usegmt=True)
@@ -0,0 +1,183 @@
+# Prediction cache in front of the model, keyed on the normalized (model_version, station, line, day, hour)
+# Map traffic is very repetitive, so rows that reach the model (everything when the prediction table is off,
+# unknown station/line combos when it's on) are looked up here first and only the misses are scored.
+#
+# Backends:
+#   LRUCache    — bounded in-process LRU with optional TTL (default)
+#   SharedCache — any Redis-style client (mget / pipeline of set with ex=), so several replicas share one cache
+#   InMemoryKV  — local stand-in for that client, for tests and single-host runs
+#
+# SharedCache does network I/O on a synchronous client, so it is marked `blocking` and the API calls it from a
+# worker thread. Each lookup or write is one round trip, and an unreachable backend counts as a miss (logged),
+# never as a failed request.
+
+from collections import OrderedDict
+from time import monotonic
+import logging, os, threading
+
+log = logging.getLogger("ttc_rider_api.prediction_cache")
+
+Key = tuple[str, str, str, str, int]
+
+
+def make_key(model_version: str, station: str, line: str, day: str, hour: int) -> Key:
+    return (model_version, station, line, day, int(hour))
+
+
+class LRUCache:
+    blocking = False
+
+    def __init__(self, maxsize: int = 100_000, ttl: float | None = None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: OrderedDict[Key, tuple[float, float]] = OrderedDict()  # key -> (value, expires_at)
+        self._lock = threading.Lock()
+        self.hits = self.misses = self.evictions = self.expirations = 0
+
+    def get_many(self, keys: list[Key]) -> list[float | None]:
+        now = monotonic()
+        out: list[float | None] = []
+        with self._lock:
+            for key in keys:
+                entry = self._data.get(key)
+                if entry is not None and entry[1] < now:
+                    del self._data[key]
+                    self.expirations += 1
+                    entry = None
+                if entry is None:
+                    self.misses += 1
+                    out.append(None)
+                else:
+                    self._data.move_to_end(key)
+                    self.hits += 1
+                    out.append(entry[0])
+        return out
+
+    def set_many(self, items: list[tuple[Key, float]]):
+        expires = monotonic() + self.ttl if self.ttl else float("inf")
+        with self._lock:
+            for key, value in items:
+                self._data[key] = (value, expires)
+                self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "backend": "lru",
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "ttl_seconds": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+            }
+
+
+class InMemoryKV:
+    """Minimal stand-in for a Redis client: mget(keys), set(key, value, ex=seconds) and pipeline()."""
+
+    def __init__(self):
+        self._data: dict[str, tuple[bytes, float]] = {}
+        self._lock = threading.Lock()
+
+    def mget(self, keys: list[str]) -> list[bytes | None]:
+        now = monotonic()
+        with self._lock:
+            out = []
+            for key in keys:
+                entry = self._data.get(key)
+                out.append(entry[0] if entry is not None and entry[1] >= now else None)
+            return out
+
+    def set(self, key: str, value, ex: int | None = None):
+        with self._lock:
+            self._data[key] = (str(value).encode(), monotonic() + ex if ex else float("inf"))
+
+    def pipeline(self, transaction: bool = True):
+        return _InMemoryPipeline(self)
+
+
+class _InMemoryPipeline:
+    """Queues set() calls and applies them on execute(), like a Redis pipeline."""
+
+    def __init__(self, kv: InMemoryKV):
+        self.kv = kv
+        self._ops: list[tuple] = []
+
+    def set(self, key: str, value, ex: int | None = None):
+        self._ops.append((key, value, ex))
+        return self
+
+    def execute(self) -> list[bool]:
+        for key, value, ex in self._ops:
+            self.kv.set(key, value, ex=ex)
+        done, self._ops = [True] * len(self._ops), []
+        return done
+
+
+class SharedCache:
+    """Cache stored in an external key-value service shared by all replicas (eviction is the server's job)."""
+
+    blocking = True
+
+    def __init__(self, client, ttl: float | None = None, prefix: str = "ttc:pred:"):
+        self.client = client
+        self.ttl = int(ttl) if ttl else None
+        self.prefix = prefix
+        self._lock = threading.Lock()
+        self.hits = self.misses = self.errors = 0
+
+    def _key(self, key: Key) -> str:
+        return self.prefix + "|".join(map(str, key))
+
+    def _error(self, op: str):
+        with self._lock:
+            self.errors += 1
+        log.warning("shared cache %s failed, falling back to the model", op, exc_info=True)
+
+    def get_many(self, keys: list[Key]) -> list[float | None]:
+        try:
+            raw = self.client.mget([self._key(k) for k in keys])
+            out = [None if v is None else float(v) for v in raw]
+        except Exception:
+            self._error("get")
+            out = [None] * len(keys)
+        hits = sum(v is not None for v in out)
+        with self._lock:
+            self.hits += hits
+            self.misses += len(out) - hits
+        return out
+
+    def set_many(self, items: list[tuple[Key, float]]):
+        if not items:
+            return
+        try:
+            pipe = self.client.pipeline(transaction=False)
+            for key, value in items:
+                pipe.set(self._key(key), repr(float(value)), ex=self.ttl)
+            pipe.execute()
+        except Exception:
+            self._error("set")
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"backend": type(self.client).__name__, "ttl_seconds": self.ttl, "hits": self.hits,
+                    "misses": self.misses, "errors": self.errors}
+
+
+def cache_from_env():
+    """TTC_CACHE_SIZE (0 disables, default 100000), TTC_CACHE_TTL (seconds, default none), TTC_CACHE_URL (redis://… to share)."""
+    size = int(os.getenv("TTC_CACHE_SIZE", "100000"))
+    ttl = float(os.getenv("TTC_CACHE_TTL", "0")) or None
+    url = os.getenv("TTC_CACHE_URL")
+    if url == "memory://":
+        return SharedCache(InMemoryKV(), ttl)
+    if url:
+        import redis  # optional: only needed when a shared cache is configured
+
+        return SharedCache(redis.Redis.from_url(url), ttl)
+    return LRUCache(size, ttl) if size > 0 else None
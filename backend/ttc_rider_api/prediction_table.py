@@ -0,0 +1,126 @@
+# Precomputed prediction table: every (station, line, day, hour) scored once so /predict can answer with array lookups
+# The model input space is tiny (~75 station/line pairs x 7 days x 24 hours, minute is always 0),
+# so scoring it all up front is cheaper than running the OHE + XGBoost pipeline on every request.
+
+from pathlib import Path
+import json, os
+import numpy as np
+import pandas as pd
+
+from ttc_rider_api.model import ARTIFACTS, predict_batch, records_frame
+from ttc_rider_api.service_hours import DAYS, open_mask
+
+# Values are a raw .npy so every uvicorn worker can memory-map the same pages read-only; the index is small JSON
+TABLE_PATH = ARTIFACTS / "prediction_table.npy"
+TABLE_INDEX_PATH = ARTIFACTS / "prediction_table.json"
+DATA_PATH = Path("ttc_rider_api/Ridership-Data.csv")
+
+HOURS = 24
+
+
+class PredictionTable:
+    """Dense float32 array of shape (pairs, 7 days, 24 hours) plus the index needed to address it."""
+
+    def __init__(self, stations: list[str], lines: list[str], values: np.ndarray, model_version: str):
+        self.stations = list(stations)
+        self.lines = list(lines)
+        self.values = values
+        self.model_version = model_version
+        self.pair_index = {pair: i for i, pair in enumerate(zip(self.stations, self.lines))}
+        self.day_index = {d: i for i, d in enumerate(DAYS)}
+
+    def lookup(self, stations, lines, days, hours) -> tuple[np.ndarray, np.ndarray]:
+        """Return (riders, found) for each record; rows with found=False are not in the table."""
+        p = np.fromiter((self.pair_index.get(pair, -1) for pair in zip(stations, lines)), dtype=np.int64, count=len(stations))
+        d = np.fromiter((self.day_index.get(day, -1) for day in days), dtype=np.int64, count=len(days))
+        h = np.asarray(hours, dtype=np.int64)
+
+        found = (p >= 0) & (d >= 0) & (h >= 0) & (h < HOURS)
+        riders = np.zeros(len(p), dtype=np.float32)
+        riders[found] = self.values[p[found], d[found], h[found]]
+        return riders, found
+
+
+def station_line_pairs(df: pd.DataFrame) -> tuple[list[str], list[str]]:
+    """Unique (station, line) pairs, sorted, from a frame with station/line columns (any case)."""
+    cols = {c.lower(): c for c in df.columns}
+    pairs = (
+        pd.DataFrame({
+            "station": df[cols["station"]].dropna().astype(str).str.strip(),
+            "line": df[cols["line"]].dropna().astype(str).str.strip(),
+        })
+        .dropna()
+        .drop_duplicates()
+        .sort_values(["station", "line"])
+    )
+    return pairs["station"].tolist(), pairs["line"].tolist()
+
+
+def build_table(model, stations: list[str], lines: list[str], model_version: str) -> PredictionTable:
+    # Full grid in (pair, day, hour) order so the flat predictions reshape straight into the table
+    n_pairs = len(stations)
+    pair_idx = np.repeat(np.arange(n_pairs), len(DAYS) * HOURS)
+    day_idx = np.tile(np.repeat(np.arange(len(DAYS)), HOURS), n_pairs)
+    hour_idx = np.tile(np.arange(HOURS), n_pairs * len(DAYS))
+
+    grid_days = np.asarray(DAYS, dtype=object)[day_idx]
+    values = np.zeros(len(pair_idx), dtype=np.float32)
+
+    # Closed hours are stored as 0 riders, same as the API rule
+    open_idx = np.flatnonzero(open_mask(grid_days, hour_idx))
+    if open_idx.size:
+        frame = records_frame(
+            np.asarray(stations, dtype=object)[pair_idx[open_idx]],
+            np.asarray(lines, dtype=object)[pair_idx[open_idx]],
+            grid_days[open_idx],
+            hour_idx[open_idx],
+        )
+        values[open_idx] = predict_batch(model, frame)
+
+    return PredictionTable(stations, lines, values.reshape(n_pairs, len(DAYS), HOURS), model_version)
+
+
+def save_table(table: PredictionTable, path: Path = TABLE_PATH, index_path: Path = TABLE_INDEX_PATH):
+    # Write to temp files and rename, so a worker mapping the table never sees a half-written file
+    tmp_path = path.with_name(f"{path.stem}.{os.getpid()}.tmp.npy")
+    tmp_index = index_path.with_name(f"{index_path.name}.{os.getpid()}.tmp")
+    np.save(tmp_path, np.ascontiguousarray(table.values, dtype=np.float32))
+    tmp_index.write_text(json.dumps({
+        "model_version": table.model_version,
+        "shape": list(table.values.shape),
+        "stations": table.stations,
+        "lines": table.lines,
+    }))
+    os.replace(tmp_path, path)
+    os.replace(tmp_index, index_path)
+
+
+def _map_table(model_version: str, path: Path, index_path: Path) -> PredictionTable | None:
+    if not (path.exists() and index_path.exists()):
+        return None
+    index = json.loads(index_path.read_text())
+    if index.get("model_version") != model_version:
+        return None
+    # mmap_mode="r": no deserialize, and workers on one host share the OS page cache
+    values = np.load(path, mmap_mode="r")
+    if list(values.shape) != index["shape"]:
+        return None
+    return PredictionTable(index["stations"], index["lines"], values, model_version)
+
+
+def load_table(model, meta: dict, path: Path = TABLE_PATH, index_path: Path = TABLE_INDEX_PATH) -> PredictionTable:
+    """Memory-map the table written by train.py, or rebuild it from the model if it is missing or stale."""
+    model_version = meta.get("model_version", "unknown")
+    table = _map_table(model_version, path, index_path)
+    if table is not None:
+        return table
+
+    stations, lines = station_line_pairs(pd.read_csv(DATA_PATH))
+    table = build_table(model, stations, lines, model_version)
+
+    # Persist the rebuilt table so the other workers (and the next start) can map it instead of rebuilding
+    try:
+        save_table(table, path, index_path)
+    except OSError:
+        return table
+    return _map_table(model_version, path, index_path) or table
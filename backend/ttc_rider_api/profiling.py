@@ -0,0 +1,133 @@
+# Opt-in instrumentation for the inference path: per-stage timings + batch sizes sent to a pluggable sink
+# Disabled by default. timer() then hands back a shared no-op object, so the hot path pays one attribute lookup per stage.
+#
+# Stages recorded per /predict request: "frame" (DataFrame construction), "lookup" (prediction table), "cache"
+# (prediction cache), "batch_wait" (micro-batching window + queue), "preprocess" (OHE/imputers), "predict" (XGBoost)
+# and "serialize" (building the response). preprocess/predict are timed on the inference thread for the whole
+# merged batch the request was scored in (see batcher.py).
+
+from bisect import bisect_left
+from time import perf_counter
+import logging, threading
+
+# Upper bounds (seconds) of the histogram buckets, Prometheus-style; the last bucket is +Inf
+BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+
+_sink = None
+
+
+class LoggingSink:
+    """Writes one structured log line per batch: batch size and each stage's duration in ms."""
+
+    def __init__(self, logger: logging.Logger | None = None):
+        self.logger = logger or logging.getLogger("ttc_rider_api.profiling")
+
+    def record(self, batch_size: int, stages: dict[str, float]):
+        self.logger.info(
+            "inference batch_size=%d %s",
+            batch_size,
+            " ".join(f"{name}_ms={secs * 1000:.3f}" for name, secs in stages.items()),
+        )
+
+
+class HistogramSink:
+    """In-process histograms per stage (plus batch sizes), readable via snapshot() for /metrics."""
+
+    def __init__(self, buckets: tuple[float, ...] = BUCKETS):
+        self.buckets = buckets
+        self._lock = threading.Lock()
+        self._stages: dict[str, dict] = {}
+        self._batches = 0
+        self._rows = 0
+
+    def record(self, batch_size: int, stages: dict[str, float]):
+        with self._lock:
+            self._batches += 1
+            self._rows += batch_size
+            for name, secs in stages.items():
+                h = self._stages.setdefault(name, {"counts": [0] * (len(self.buckets) + 1), "sum": 0.0, "count": 0})
+                h["counts"][bisect_left(self.buckets, secs)] += 1
+                h["sum"] += secs
+                h["count"] += 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "batches": self._batches,
+                "rows": self._rows,
+                "buckets": [*self.buckets, "+Inf"],
+                "stages": {
+                    name: {"count": h["count"], "sum_seconds": h["sum"], "counts": list(h["counts"])}
+                    for name, h in self._stages.items()
+                },
+            }
+
+
+class _StageTimer:
+    __slots__ = ("batch_size", "stages", "_last")
+
+    def __init__(self, batch_size: int):
+        self.batch_size = batch_size
+        self.stages: dict[str, float] = {}
+        self._last = perf_counter()
+
+    def lap(self, stage: str):
+        """Close the current stage: time since the previous lap (or creation) is charged to `stage`."""
+        now = perf_counter()
+        self.stages[stage] = self.stages.get(stage, 0.0) + (now - self._last)
+        self._last = now
+
+    def charge(self, stages: dict[str, float], rest: str):
+        """Close the current stage with durations measured elsewhere: `stages` as given, the remainder to `rest`."""
+        now = perf_counter()
+        measured = 0.0
+        for stage, secs in stages.items():
+            self.stages[stage] = self.stages.get(stage, 0.0) + secs
+            measured += secs
+        self.stages[rest] = self.stages.get(rest, 0.0) + max(0.0, now - self._last - measured)
+        self._last = now
+
+    def done(self):
+        if _sink is not None:
+            _sink.record(self.batch_size, self.stages)
+
+
+class _NullTimer:
+    __slots__ = ()
+    stages: dict[str, float] = {}  # always empty
+
+    def lap(self, stage: str):
+        pass
+
+    def charge(self, stages: dict[str, float], rest: str):
+        pass
+
+    def done(self):
+        pass
+
+
+NULL_TIMER = _NullTimer()
+
+
+def set_sink(sink):
+    """Install a sink (anything with record(batch_size, stages)), or None to turn profiling off."""
+    global _sink
+    _sink = sink
+
+
+def get_sink():
+    return _sink
+
+
+def timer(batch_size: int):
+    return _StageTimer(batch_size) if _sink is not None else NULL_TIMER
+
+
+def sink_from_env(value: str | None):
+    """Map the TTC_PROFILING setting ("off", "log", "histogram") to a sink."""
+    value = (value or "off").lower()
+    if value == "log":
+        return LoggingSink()
+    if value == "histogram":
+        return HistogramSink()
+    return None
@@ -0,0 +1,141 @@
+# TTC service hours: one declarative schedule, compiled into a (day x minute-of-day) boolean lookup table
+#
+# Every service-hours check (API, training filter, table build, scripts) goes through this module. Masking a
+# batch is a single fancy index into the table: table[day_index, hour * 60 + minute].
+#
+# Times after midnight belong to the previous service day, matching the ridership data (hour 0/1 rows carry the
+# day they started on): "monday" 00:00–01:30 is the tail of Monday's service, not the start of Tuesday's.
+#
+# Date-specific service (holidays running the Sunday schedule, extended service for special events, ...) is declared
+# in service_calendar.json (TTC_SERVICE_CALENDAR overrides the path) and applies when a date is known.
+
+from datetime import date
+from pathlib import Path
+import json, os
+import numpy as np
+import pandas as pd
+
+DAYS = ["monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday"]
+MINUTES_PER_DAY = 24 * 60
+
+# Regular weekly service: first train → last train (closing times before the opening time run past midnight)
+WEEKLY_SCHEDULE = {
+    "weekday": {"days": DAYS[:5], "open": "06:00", "close": "01:30"},
+    "weekend": {"days": DAYS[5:], "open": "08:00", "close": "01:30"},
+}
+# Day names we don't recognize get the weekday schedule (what the API has always done)
+FALLBACK_DAY = "monday"
+
+CALENDAR_PATH = Path(os.getenv("TTC_SERVICE_CALENDAR", Path(__file__).with_name("service_calendar.json")))
+
+
+def _minute(hhmm: str) -> int:
+    h, m = hhmm.split(":")
+    return int(h) * 60 + int(m)
+
+
+def service_row(open_at: str, close_at: str) -> np.ndarray:
+    """Open minutes of one service day: open → midnight, plus 00:00 → close (inclusive) when it runs past midnight."""
+    row = np.zeros(MINUTES_PER_DAY, dtype=bool)
+    start, end = _minute(open_at), _minute(close_at)
+    if end > start:
+        row[start:end + 1] = True
+    else:
+        row[start:] = True
+        row[:end + 1] = True
+    return row
+
+
+class ServiceHours:
+    """Compiled schedule: `table` is bool (7 days, 1440 minutes); `calendar` maps ISO dates to overrides."""
+
+    def __init__(self, schedule: dict = WEEKLY_SCHEDULE, calendar: dict | None = None):
+        self.schedule = schedule
+        self.calendar = calendar or {}
+        self.table = np.zeros((len(DAYS), MINUTES_PER_DAY), dtype=bool)
+        self.hours = {}
+        for rule in schedule.values():
+            for day in rule["days"]:
+                self.table[DAYS.index(day)] = service_row(rule["open"], rule["close"])
+                self.hours[day] = (rule["open"], rule["close"])
+        self._day_index = pd.Index(DAYS)
+        self._date_rows: dict[str, np.ndarray] = {}
+
+    # Scalar API
+    def is_open(self, day: str, hour: int, minute: int = 0) -> bool:
+        if not (0 <= hour < 24 and 0 <= minute < 60):
+            return False
+        d = DAYS.index(day) if day in DAYS else DAYS.index(FALLBACK_DAY)
+        return bool(self.table[d, hour * 60 + minute])
+
+    def open_hours(self, day: str) -> list[int]:
+        """Whole hours that are open at :00, in service order (e.g. 6..23, 0, 1)."""
+        row = self.table[DAYS.index(day) if day in DAYS else DAYS.index(FALLBACK_DAY)]
+        start = _minute(self.hours.get(day, self.hours[FALLBACK_DAY])[0]) // 60
+        return [h % 24 for h in range(start, start + 24) if row[(h % 24) * 60]]
+
+    # Array API
+    def day_index(self, days) -> np.ndarray:
+        """Row index per day name (normalized lower-case names; unknown names → the fallback day)."""
+        idx = self._day_index.get_indexer(pd.Index(np.asarray(days, dtype=object)))
+        idx[idx < 0] = DAYS.index(FALLBACK_DAY)
+        return idx
+
+    def open_mask(self, days, hours, minutes=None) -> np.ndarray:
+        """One bool per row; hours/minutes outside 0–23 / 0–59 are closed. minutes=None means :00."""
+        hours = np.asarray(hours, dtype=np.int64)
+        minutes = np.zeros_like(hours) if minutes is None else np.asarray(minutes, dtype=np.int64)
+        valid = (hours >= 0) & (hours < 24) & (minutes >= 0) & (minutes < 60)
+        out = np.zeros(hours.shape, dtype=bool)
+        d = self.day_index(days)
+        out[valid] = self.table[d[valid], hours[valid] * 60 + minutes[valid]]
+        return out
+
+    # Date-aware API (holidays / special service)
+    def date_row(self, day: date) -> np.ndarray:
+        key = day.isoformat()
+        row = self._date_rows.get(key)
+        if row is None:
+            override = self.calendar.get(key, {})
+            weekday = override.get("schedule", DAYS[day.weekday()])
+            open_at, close_at = self.hours.get(weekday, self.hours[FALLBACK_DAY])
+            row = service_row(override.get("open", open_at), override.get("close", close_at))
+            self._date_rows[key] = row
+        return row
+
+    def open_mask_dates(self, dates, hours, minutes=None) -> np.ndarray:
+        """Like open_mask, but rows are calendar dates (anything pandas parses), so calendar overrides apply."""
+        dates = pd.to_datetime(pd.Series(np.asarray(dates)), errors="coerce")
+        codes, uniques = pd.factorize(dates.dt.date)
+        rows = np.stack([self.date_row(d) for d in uniques]) if len(uniques) else np.zeros((0, MINUTES_PER_DAY), bool)
+
+        hours = np.asarray(hours, dtype=np.int64)
+        minutes = np.zeros_like(hours) if minutes is None else np.asarray(minutes, dtype=np.int64)
+        valid = (codes >= 0) & (hours >= 0) & (hours < 24) & (minutes >= 0) & (minutes < 60)
+        out = np.zeros(hours.shape, dtype=bool)
+        out[valid] = rows[codes[valid], hours[valid] * 60 + minutes[valid]]
+        return out
+
+
+def load_calendar(path: Path = CALENDAR_PATH) -> dict:
+    if not Path(path).exists():
+        return {}
+    return {k: v for k, v in json.loads(Path(path).read_text()).items() if not k.startswith("_")}
+
+
+SERVICE = ServiceHours(calendar=load_calendar())
+
+# Module-level shortcuts for the default schedule
+is_open = SERVICE.is_open
+open_mask = SERVICE.open_mask
+open_hours = SERVICE.open_hours
+
+
+def frame_open_mask(df_like: pd.DataFrame) -> np.ndarray:
+    """open_mask for a frame with day/hour(/minute) columns in any case and any text formatting."""
+    cols = {c.lower().strip(): c for c in df_like.columns}
+    days = df_like[cols["day"]].astype(str).str.strip().str.lower()
+    hours = pd.to_numeric(df_like[cols["hour"]], errors="coerce").fillna(-1)
+    minutes = pd.to_numeric(df_like[cols["minute"]], errors="coerce").fillna(0) if "minute" in cols else None
+    return open_mask(days.to_numpy(dtype=object), hours.to_numpy(dtype=np.int64),
+                     None if minutes is None else minutes.to_numpy(dtype=np.int64))
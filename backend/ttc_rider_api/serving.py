@@ -0,0 +1,120 @@
+# Everything /predict needs for one model version (model, meta, prediction table), loaded and swapped as a unit
+# Handlers read the module-level `current` once per request, so a reload is a single reference assignment:
+# in-flight requests finish on the old bundle and new requests only ever see a fully loaded and warmed one.
+
+import logging, os, threading, time
+import numpy as np
+
+from ttc_rider_api.model import META_PATH, MODEL_PATH, load_model, predict_batch, records_frame
+from ttc_rider_api.booster import load_native_model
+from ttc_rider_api.prediction_table import load_table
+
+log = logging.getLogger("ttc_rider_api.serving")
+
+# "native" scores with the raw XGBoost booster + frozen one-hot index, "sklearn" keeps the full pipeline
+INFERENCE = os.getenv("TTC_INFERENCE", "native").lower()
+# "table" answers /predict from the precomputed (station, line, day, hour) table, "model" always runs XGBoost
+SERVING_MODE = os.getenv("TTC_SERVING_MODE", "table").lower()
+
+
+class ServingState:
+    __slots__ = ("model", "meta", "table", "model_version", "artifact_mtime", "timings")
+
+    def __init__(self, model, meta: dict, table, artifact_mtime: float):
+        self.model = model
+        self.meta = meta
+        self.table = table
+        self.model_version = meta.get("model_version", "unknown")
+        self.artifact_mtime = artifact_mtime
+        self.timings: dict[str, float] = {}
+
+
+def _artifact_mtime() -> float:
+    # train.py writes meta.json last, so its mtime marks a complete set of artifacts
+    path = META_PATH if META_PATH.exists() else MODEL_PATH
+    return path.stat().st_mtime
+
+
+# Batch sizes run through the model at warm-up: single records and the batched sizes /predict sees under load
+WARM_UP_SIZES = (1, 64, 1024)
+
+
+def warm_up(state: ServingState):
+    """
+    Run representative predictions through the new model so the first real requests don't pay one-time costs
+    (XGBoost thread pool spin-up, pandas/sklearn lazy init, first page faults on the memory-mapped table).
+    """
+    days = ["monday", "friday", "saturday", "sunday"]
+    if state.table is not None and state.table.stations:
+        stations, lines = state.table.stations, state.table.lines
+    else:
+        stations, lines = ["Union"], ["Line 1"]
+
+    for n in WARM_UP_SIZES:
+        i = np.arange(n)
+        frame = records_frame(
+            [stations[k % len(stations)] for k in i],
+            [lines[k % len(lines)] for k in i],
+            [days[k % len(days)] for k in i],
+            8 + i % 16,
+        )
+        preds = predict_batch(state.model, frame)
+        if not np.all(np.isfinite(preds)):
+            raise RuntimeError(f"warm-up produced non-finite predictions at batch size {n}")
+
+    if state.table is not None:
+        np.asarray(state.table.values).sum()  # touch every page of the mapping once
+
+
+def load_state() -> ServingState:
+    t0 = time.perf_counter()
+    mtime = _artifact_mtime()
+    model, meta = load_model()
+    if INFERENCE == "native":
+        model = load_native_model(model, meta)
+    table = load_table(model, meta) if SERVING_MODE == "table" else None
+
+    state = ServingState(model, meta, table, mtime)
+    t1 = time.perf_counter()
+    warm_up(state)
+    state.timings = {"load_seconds": t1 - t0, "warm_up_seconds": time.perf_counter() - t1}
+    log.info("loaded %s in %.2fs, warmed up in %.2fs", state.model_version, t1 - t0, state.timings["warm_up_seconds"])
+    return state
+
+
+current: ServingState | None = None
+_reload_lock = threading.Lock()
+
+# Readiness: set by the first successful swap, whoever does it (startup, POST /reload or the watcher)
+ready = threading.Event()
+startup_error: str | None = None
+
+
+def reload() -> tuple[ServingState, bool]:
+    """Load + warm the artifacts on disk, then swap them in. Returns (active state, swapped?)."""
+    global current, startup_error
+    with _reload_lock:
+        new = load_state()
+        old = current
+        if old is not None and new.model_version == old.model_version and new.artifact_mtime == old.artifact_mtime:
+            return old, False
+        current = new
+        startup_error = None
+        ready.set()
+        log.info("model swapped: %s -> %s", old.model_version if old else None, new.model_version)
+        return new, True
+
+
+def artifacts_changed() -> bool:
+    return current is None or _artifact_mtime() != current.artifact_mtime
+
+
+def watch(interval: float, stop: threading.Event):
+    """Background loop: poll the artifacts every `interval` seconds and hot-swap when they change."""
+    while not stop.wait(interval):
+        try:
+            if artifacts_changed():
+                reload()
+        except Exception:
+            # Keep serving the current model; the next poll retries
+            log.exception("model reload failed")
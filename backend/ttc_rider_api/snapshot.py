@@ -0,0 +1,143 @@
+# Network snapshot: every station/line x day x hour prediction of one model version, in one small static file
+#
+# The map only needs rider counts (or a crowding level) per station, so the frontend can load this once per model
+# version and scrub the whole week locally, with no /heatmap or /predict calls. Size comes from three steps:
+#   1. quantize: "counts" rounds riders to uint16, clipping to 0..65535 (the model can predict negative riders for
+#      quiet hours; those become 0 and are counted in the header's "clipped"); "bins" maps them to a uint8 level
+#   2. delta-encode along the hour axis: each (pair, day) row keeps hour 0, then hour[h] - hour[h - 1]
+#   3. zigzag + LEB128 varints: ridership is smooth hour to hour, so most deltas fit in 1-2 bytes
+#
+# Framing is the same as encoding.pack_tensor: 4-byte little-endian header length, JSON header (labels, shape,
+# quantization), then the varint payload. Sub-hour times are interpolated client-side like timeline.blend does.
+
+from pathlib import Path
+import json, os, struct
+import numpy as np
+
+from ttc_rider_api.encoding import dumps
+from ttc_rider_api.model import ARTIFACTS
+from ttc_rider_api.prediction_table import DAYS, HOURS, PredictionTable
+from ttc_rider_api.forecast import forecast
+from ttc_rider_api.heatmap import network_pairs
+from ttc_rider_api.memo import MEMO
+from ttc_rider_api.timeline import BUCKET_MINUTES
+
+SNAPSHOT_MEDIA_TYPE = "application/x-ttc-snapshot"
+SNAPSHOT_FORMAT = 1
+SNAPSHOT_DIR = ARTIFACTS / "snapshots"
+
+# Crowding level = number of edges <= riders: 0 is closed / no riders, 6 is 8000+ riders in the hour
+CROWDING_EDGES = [1, 500, 1000, 2000, 4000, 8000]
+CROWDING_LEVELS = ["closed", "quiet", "light", "moderate", "busy", "very busy", "packed"]
+
+MODES = {"counts": np.uint16, "bins": np.uint8}
+CLIP = (0, int(np.iinfo(np.uint16).max))
+
+
+def quantize(values: np.ndarray, mode: str = "counts") -> np.ndarray:
+    values = np.nan_to_num(np.asarray(values, dtype=np.float32))
+    if mode == "bins":
+        return np.searchsorted(CROWDING_EDGES, values, side="right").astype(np.uint8)
+    return np.clip(np.rint(values), *CLIP).astype(np.uint16)
+
+
+def delta_encode(q: np.ndarray) -> np.ndarray:
+    """Differences along the last (hour) axis; the first hour of each row is kept as is."""
+    return np.diff(q.astype(np.int64), axis=-1, prepend=0)
+
+
+def delta_decode(deltas: np.ndarray) -> np.ndarray:
+    return np.cumsum(deltas, axis=-1)
+
+
+def varint_encode(ints: np.ndarray) -> bytes:
+    """Zigzag + LEB128 (7 bits per byte, high bit = more bytes follow), vectorized over a flat int array."""
+    ints = np.asarray(ints, dtype=np.int64).ravel()
+    zz = ((ints << 1) ^ (ints >> 63)).astype(np.uint64)
+    nbytes = np.ones(zz.shape, dtype=np.int64)
+    for k in range(1, 10):
+        nbytes += zz >= np.uint64(1 << (7 * k))
+    offsets = np.cumsum(nbytes) - nbytes
+
+    out = np.zeros(int(nbytes.sum()), dtype=np.uint8)
+    for k in range(int(nbytes.max(initial=0))):
+        rows = np.flatnonzero(nbytes > k)
+        byte = (zz[rows] >> np.uint64(7 * k)) & np.uint64(0x7F)
+        more = np.where(nbytes[rows] > k + 1, 0x80, 0).astype(np.uint64)
+        out[offsets[rows] + k] = (byte | more).astype(np.uint8)
+    return out.tobytes()
+
+
+def varint_decode(data: bytes) -> np.ndarray:
+    buf = np.frombuffer(data, dtype=np.uint8)
+    last = buf < 0x80                                   # final byte of each value
+    group = np.concatenate([[0], np.cumsum(last)[:-1]]) if buf.size else np.zeros(0, np.int64)
+    starts = np.concatenate([[0], np.flatnonzero(last)[:-1] + 1])
+    shift = (np.arange(buf.size) - starts[group]) * 7
+
+    zz = np.zeros(int(last.sum()), dtype=np.uint64)
+    np.bitwise_or.at(zz, group, (buf & 0x7F).astype(np.uint64) << shift.astype(np.uint64))
+    return (zz >> np.uint64(1)).astype(np.int64) ^ -(zz & np.uint64(1)).astype(np.int64)
+
+
+def pack_snapshot(values: np.ndarray, stations: list[str], lines: list[str], model_version: str,
+                  mode: str = "counts") -> bytes:
+    """values: riders as (pairs, 7 days, 24 hours), e.g. PredictionTable.values."""
+    if mode not in MODES:
+        raise ValueError(f"mode must be one of {list(MODES)}, got {mode!r}")
+    q = quantize(values, mode)
+    header = {
+        "format": SNAPSHOT_FORMAT,
+        "model_version": model_version,
+        "stations": stations,
+        "lines": lines,
+        "days": DAYS,
+        "hours": HOURS,
+        "bucket_minutes": BUCKET_MINUTES,
+        "shape": list(q.shape),
+        "quantization": mode,
+        "dtype": np.dtype(MODES[mode]).name,
+        "encoding": "delta-hour/zigzag-varint",
+    }
+    if mode == "counts":
+        # Counts outside the uint16 range are stored as the nearest bound (negative predictions → 0 riders)
+        rounded = np.rint(np.nan_to_num(np.asarray(values, dtype=np.float32)))
+        clipped = int(((rounded < CLIP[0]) | (rounded > CLIP[1])).sum())
+        header["clipped"] = {"min": CLIP[0], "max": CLIP[1], "cells": clipped}
+    if mode == "bins":
+        header.update(edges=CROWDING_EDGES, levels=CROWDING_LEVELS)
+    head = dumps(header)
+    return struct.pack("<I", len(head)) + head + varint_encode(delta_encode(q))
+
+
+def unpack_snapshot(body: bytes) -> tuple[dict, np.ndarray]:
+    """Inverse of pack_snapshot: the header and the quantized (pairs, days, hours) array."""
+    (n,) = struct.unpack_from("<I", body)
+    header = json.loads(body[4:4 + n])
+    deltas = varint_decode(body[4 + n:]).reshape(header["shape"])
+    return header, delta_decode(deltas).astype(header["dtype"])
+
+
+def network_snapshot(model, meta: dict, table: PredictionTable | None, mode: str = "counts") -> bytes:
+    """The whole network as a packed snapshot, memoized per model version (one entry per mode)."""
+    model_version = meta.get("model_version", "unknown")
+
+    def build() -> bytes:
+        stations, lines = network_pairs(table)
+        values = forecast(model, table, stations, lines, list(range(len(DAYS))), list(range(HOURS)))
+        return pack_snapshot(values, stations, lines, model_version, mode)
+
+    return MEMO.get(model_version, ("snapshot", mode), build)
+
+
+def snapshot_path(model_version: str, mode: str, directory: Path = SNAPSHOT_DIR) -> Path:
+    """One file per model version and mode, so a static host can serve it with an immutable Cache-Control."""
+    return Path(directory) / f"network-{model_version}-{mode}.bin"
+
+
+def save_snapshot(body: bytes, path: Path):
+    # Temp file + rename, same as save_table: a server reading the directory never sees a half-written snapshot
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    tmp.write_bytes(body)
+    os.replace(tmp, path)
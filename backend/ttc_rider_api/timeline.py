@@ -0,0 +1,32 @@
+# Sub-hour timeline: minute-resolution riders from the hourly predictions, with no extra model calls
+#
+# Training data only has minute 0, so the model's `minute` feature carries no signal and scoring e.g. 08:45
+# directly would just return the 08:00 value. Instead a time is snapped down to a bucket (TTC_BUCKET_MINUTES,
+# default 15) and linearly interpolated between the hourly values at h and h+1, which the prediction table
+# (or cache/model) already provides. Hour 23 blends into hour 0 of the same service day. Closed times are then
+# zeroed with the minute-aware service rule (trains stop at 01:30).
+
+import os
+import numpy as np
+
+from ttc_rider_api.prediction_table import HOURS
+
+BUCKET_MINUTES = int(os.getenv("TTC_BUCKET_MINUTES", "15"))
+if BUCKET_MINUTES < 1 or 60 % BUCKET_MINUTES:
+    raise ValueError(f"TTC_BUCKET_MINUTES must divide 60, got {BUCKET_MINUTES}")
+
+
+def snap_minutes(minutes) -> np.ndarray:
+    """Round minutes down to the start of their bucket (0, 15, 30, 45 by default)."""
+    minutes = np.asarray(minutes, dtype=np.int64)
+    return minutes - minutes % BUCKET_MINUTES
+
+
+def next_hours(hours) -> np.ndarray:
+    return (np.asarray(hours, dtype=np.int64) + 1) % HOURS
+
+
+def blend(at_hour: np.ndarray, at_next_hour: np.ndarray, minutes) -> np.ndarray:
+    """Linear interpolation between the two hourly values, vectorized over rows (or rows x anything)."""
+    frac = np.asarray(minutes, dtype=np.float32) / 60
+    return at_hour * (1 - frac) + at_next_hour * frac
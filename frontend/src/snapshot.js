@@ -0,0 +1,58 @@
+// Network snapshot loader: the whole week of predictions in one request, indexed locally
+// Format (backend/ttc_rider_api/snapshot.py): 4-byte little-endian header length, JSON header,
+// then zigzag varints holding hour-to-hour deltas of uint16 riders ("counts") or uint8 crowding levels ("bins").
+// Counts are clipped to 0..65535: negative model outputs arrive as 0 riders (header.clipped says how many).
+
+function decodeValues(bytes, count, TypedArray, rowLength) {
+  const values = new TypedArray(count);
+  let pos = 0;
+  let prev = 0;
+  for (let i = 0; i < count; i++) {
+    let zz = 0;
+    let shift = 0;
+    let b;
+    do {
+      b = bytes[pos++];
+      zz += (b & 0x7f) * 2 ** shift;
+      shift += 7;
+    } while (b & 0x80);
+    const delta = zz % 2 ? -(zz + 1) / 2 : zz / 2;
+    prev = i % rowLength === 0 ? delta : prev + delta;
+    values[i] = prev;
+  }
+  return values;
+}
+
+export function parseSnapshot(buffer) {
+  const headerLength = new DataView(buffer).getUint32(0, true);
+  const header = JSON.parse(new TextDecoder().decode(new Uint8Array(buffer, 4, headerLength)));
+  const [pairs, days, hours] = header.shape;
+  const TypedArray = header.dtype === "uint8" ? Uint8Array : Uint16Array;
+  const values = decodeValues(new Uint8Array(buffer, 4 + headerLength), pairs * days * hours, TypedArray, hours);
+
+  const pairIndex = new Map(header.stations.map((s, i) => [`${s}|${header.lines[i]}`, i]));
+  const dayIndex = new Map(header.days.map((d, i) => [d, i]));
+
+  // Value at (station, line, day, hour, minute); minutes interpolate towards the next hour like the API
+  // (without its minute-level closing: anything after 01:30 still blends towards the closed 02:00 slot)
+  function at(station, line, day, hour, minute = 0) {
+    const p = pairIndex.get(`${station}|${line}`);
+    const d = dayIndex.get(day.toLowerCase());
+    if (p === undefined || d === undefined) return null;
+    const row = (p * days + d) * hours;
+    const value = values[row + hour];
+    if (!minute || header.quantization === "bins") return value;
+    const snapped = minute - (minute % header.bucket_minutes);
+    const frac = snapped / 60;
+    return value * (1 - frac) + values[row + ((hour + 1) % hours)] * frac;
+  }
+
+  return { header, values, at };
+}
+
+export async function loadSnapshot(apiUrl, mode = "counts", version) {
+  const query = new URLSearchParams({ mode, ...(version ? { v: version } : {}) });
+  const res = await fetch(`${apiUrl}/snapshot?${query}`);
+  if (!res.ok) throw new Error(`HTTP ${res.status}`);
+  return parseSnapshot(await res.arrayBuffer());
+}